@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from corpus import build_corpora
+from markdown_parser import (
+    block_to_block_type,
+    markdown_to_blocks,
+    markdown_to_html_node,
+    text_to_textnodes,
+)
+from split_textnode import split_nodes_delimiter
+from textnode import TextNode, TextType
+
+LINE_MARKER_PATTERN = re.compile(r"^(>+ ?|[-*] |\d+\. )", re.MULTILINE)
+
+
+def best_of(repeat: int, func, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def inline_texts(pages: list[str]) -> list[str]:
+    texts = []
+    for page in pages:
+        for block in markdown_to_blocks(page):
+            if block_to_block_type(block) not in ("code", "heading"):
+                texts.append(LINE_MARKER_PATTERN.sub("", block))
+    return texts
+
+
+def stage_inputs(pages: list[str]) -> dict[str, tuple]:
+    blocks = inline_texts(pages)
+    delimited = [TextNode(b, TextType.TEXT) for b in blocks if b.count("**") % 2 == 0]
+    trees = [markdown_to_html_node(page) for page in pages]
+    html_size = sum(len(tree.to_html().encode()) for tree in trees)
+
+    def run_blocks():
+        for page in pages:
+            markdown_to_blocks(page)
+
+    def run_inline():
+        for block in blocks:
+            text_to_textnodes(block)
+
+    def run_delimiter():
+        split_nodes_delimiter(delimited, "**", TextType.BOLD)
+
+    def run_pipeline():
+        for page in pages:
+            markdown_to_html_node(page)
+
+    def run_to_html():
+        for tree in trees:
+            tree.to_html()
+
+    def size(texts) -> int:
+        return sum(len(text.encode()) for text in texts)
+
+    # stage name -> (callable, bytes processed, pages processed)
+    return {
+        "markdown_to_blocks": (run_blocks, size(pages), len(pages)),
+        "text_to_textnodes": (run_inline, size(blocks), len(pages)),
+        "split_nodes_delimiter": (
+            run_delimiter,
+            size(node.text for node in delimited),
+            len(pages),
+        ),
+        "markdown_to_html_node": (run_pipeline, size(pages), len(pages)),
+        "to_html": (run_to_html, html_size, len(pages)),
+    }
+
+
+def run(scale: float, repeat: int, only: list[str]) -> dict[str, dict]:
+    results = {}
+    for corpus_name, pages in build_corpora(scale).items():
+        if only and corpus_name not in only:
+            continue
+        for stage, (func, size, count) in stage_inputs(pages).items():
+            seconds = best_of(repeat, func)
+            results[f"{corpus_name}/{stage}"] = {
+                "seconds": seconds,
+                "mb_per_s": size / seconds / 1e6 if seconds else 0.0,
+                "pages_per_s": count / seconds if seconds else 0.0,
+            }
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["mb_per_s"]
+        after = result["mb_per_s"]
+        result["change"] = (after - before) / before if before else 0.0
+        if result["change"] < -threshold:
+            regressions.append(name)
+    return regressions
+
+
+def print_report(results: dict) -> None:
+    print(f"{'benchmark':<42} {'MB/s':>10} {'pages/s':>12} {'change':>8}")
+    for name, result in results.items():
+        change = result.get("change")
+        change = f"{change:+.1%}" if change is not None else ""
+        print(
+            f"{name:<42} {result['mb_per_s']:>10.2f} "
+            f"{result['pages_per_s']:>12.1f} {change:>8}"
+        )
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the markdown to HTML pipeline."
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="corpus size factor")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark")
+    parser.add_argument(
+        "--corpus", action="append", default=[], help="only run this corpus"
+    )
+    parser.add_argument("--save", metavar="PATH", help="save results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare with a baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="fractional MB/s drop reported as a regression (default 0.10)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.scale, args.repeat, args.corpus)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    print_report(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for name in regressions:
+            print(f"  {name}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import random
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog middle earth ring bearer wizard "
+    "elf dwarf hobbit river mountain forest shire tower king road journey"
+).split()
+
+
+def sentence(rng: random.Random, length: int = 12) -> str:
+    words = [rng.choice(WORDS) for _ in range(length)]
+    words[0] = words[0].capitalize()
+    return " ".join(words) + "."
+
+
+def inline_text(rng: random.Random, sentences: int = 4) -> str:
+    parts = []
+    for _ in range(sentences):
+        text = sentence(rng)
+        roll = rng.random()
+        if roll < 0.2:
+            text = f"{text} **{rng.choice(WORDS)} {rng.choice(WORDS)}**"
+        elif roll < 0.4:
+            text = f"{text} *{rng.choice(WORDS)}*"
+        elif roll < 0.5:
+            text = f"{text} `{rng.choice(WORDS)}()`"
+        parts.append(text)
+    return " ".join(parts)
+
+
+def link(rng: random.Random) -> str:
+    word = rng.choice(WORDS)
+    if rng.random() < 0.2:
+        return f"![{word} image](/images/{word}.png)"
+    return f"[{word} page](/{word}/{rng.randrange(1000)})"
+
+
+def small_page(rng: random.Random) -> str:
+    blocks = [f"# {sentence(rng, 4)[:-1]}"]
+    for _ in range(3):
+        blocks.append(inline_text(rng))
+    blocks.append("\n".join(f"* {sentence(rng, 5)}" for _ in range(4)))
+    blocks.append(f"## {sentence(rng, 3)[:-1]}")
+    blocks.append(inline_text(rng))
+    return "\n\n".join(blocks) + "\n"
+
+
+def huge_page(rng: random.Random, sections: int = 2000) -> str:
+    blocks = [f"# {sentence(rng, 4)[:-1]}"]
+    for i in range(sections):
+        blocks.append(f"## Section {i}")
+        blocks.append(inline_text(rng, 8))
+        if i % 5 == 0:
+            code = "\n".join(sentence(rng) for _ in range(6))
+            blocks.append(f"```\n{code}\n```")
+        if i % 3 == 0:
+            blocks.append("\n".join(f"{n}. {sentence(rng, 6)}" for n in range(1, 6)))
+    return "\n\n".join(blocks) + "\n"
+
+
+def link_heavy_page(rng: random.Random) -> str:
+    blocks = [f"# {sentence(rng, 4)[:-1]}"]
+    for _ in range(40):
+        blocks.append(" ".join(f"{link(rng)} {rng.choice(WORDS)}" for _ in range(15)))
+    return "\n\n".join(blocks) + "\n"
+
+
+def list_heavy_page(rng: random.Random) -> str:
+    blocks = [f"# {sentence(rng, 4)[:-1]}"]
+    for i in range(30):
+        if i % 2:
+            items = [f"- {inline_text(rng, 1)}" for _ in range(25)]
+        else:
+            items = [f"{n}. {inline_text(rng, 1)}" for n in range(1, 26)]
+        blocks.append("\n".join(items))
+    return "\n\n".join(blocks) + "\n"
+
+
+def nested_quote_page(rng: random.Random, depth: int = 20) -> str:
+    blocks = [f"# {sentence(rng, 4)[:-1]}"]
+    for _ in range(30):
+        lines = [
+            ">" * (level + 1) + " " + inline_text(rng, 1) for level in range(depth)
+        ]
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks) + "\n"
+
+
+def build_corpora(scale: float = 1.0, seed: int = 0) -> dict[str, list[str]]:
+    rng = random.Random(seed)
+
+    def count(n: int) -> int:
+        return max(1, int(n * scale))
+
+    return {
+        "small_pages": [small_page(rng) for _ in range(count(500))],
+        "huge_pages": [huge_page(rng) for _ in range(count(2))],
+        "link_heavy": [link_heavy_page(rng) for _ in range(count(50))],
+        "list_heavy": [list_heavy_page(rng) for _ in range(count(50))],
+        "nested_quotes": [nested_quote_page(rng) for _ in range(count(50))],
+    }
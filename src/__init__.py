@@ -1,6 +1,22 @@
+from aggregate import *
+from async_build import *
+from block_cache import *
+from build_session import *
 from copytree import *
+from depgraph import *
+from dev_server import *
+from escape import *
 from generate_page import *
 from htmlnode import *
+from manifest import *
 from markdown_parser import *
+from metadata import *
+from output_io import *
+from profiler import *
+from render_cache import *
+from source_io import *
 from split_textnode import *
+from template import *
 from textnode import *
+from validate import *
+from watch import *
@@ -0,0 +1,223 @@
+import os
+import re
+import urllib.parse
+from typing import Iterable
+
+from escape import escape_attribute, escape_text
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from metadata import MetadataIndex, PageMetadata
+from output_io import create_output_dirs, write_output
+from template import load_template
+
+ARCHIVE_SIZE = 20
+FEED_SIZE = 20
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+SLUG_PATTERN = re.compile(r"[\W_]+")
+
+
+def page_url(output: str) -> str:
+    # Index pages are linked by their directory, like the site's own links.
+    if output == "index.html":
+        return "/"
+    if output.endswith("/index.html"):
+        output = output[: -len("index.html")]
+    return urllib.parse.quote(f"/{output}")
+
+
+def tag_slug(tag: str) -> str:
+    # Letters of any script are kept; page_url percent-encodes them in links.
+    return SLUG_PATTERN.sub("-", tag.lower()).strip("-") or "tag"
+
+
+def tag_slugs(tags: Iterable[str]) -> dict[str, str]:
+    # Tags that slug alike ("C", "C#", "C++") are numbered in tag order, so
+    # every tag keeps a page of its own.
+    slugs = {}
+    taken = set()
+    for tag in sorted(tags):
+        slug = base = tag_slug(tag)
+        number = 2
+        while slug in taken:
+            slug = f"{base}-{number}"
+            number += 1
+        taken.add(slug)
+        slugs[tag] = slug
+    return slugs
+
+
+def archive_path(number: int) -> str:
+    if number == 1:
+        return "archive/index.html"
+    return f"archive/{number}/index.html"
+
+
+def tag_path(slug: str) -> str:
+    return f"tags/{slug}/index.html"
+
+
+def paginate(entries: list[PageMetadata], size: int) -> list[list[PageMetadata]]:
+    return [entries[i : i + size] for i in range(0, len(entries), size)] or [[]]
+
+
+def entry_node(entry: PageMetadata) -> ParentNode:
+    children: list[HTMLNode] = [
+        LeafNode("a", entry.title, {"href": page_url(entry.output)})
+    ]
+    if entry.date:
+        children.append(LeafNode(None, " "))
+        children.append(LeafNode("time", entry.date, {"datetime": entry.date}))
+    return ParentNode("li", children)
+
+
+def listing_node(
+    heading: str,
+    entries: list[PageMetadata],
+    newer: str = None,
+    older: str = None,
+) -> ParentNode:
+    children: list[HTMLNode] = [LeafNode("h1", heading)]
+    if entries:
+        children.append(ParentNode("ul", [entry_node(entry) for entry in entries]))
+    links = []
+    if newer is not None:
+        links.append(LeafNode("a", "Newer", {"href": page_url(newer), "rel": "prev"}))
+    if older is not None:
+        links.append(LeafNode("a", "Older", {"href": page_url(older), "rel": "next"}))
+    if links:
+        children.append(ParentNode("nav", links))
+    return ParentNode("div", children)
+
+
+def tags_node(
+    tags: dict[str, list[PageMetadata]], slugs: dict[str, str]
+) -> ParentNode:
+    items = [
+        ParentNode(
+            "li",
+            [
+                LeafNode("a", tag, {"href": page_url(tag_path(slugs[tag]))}),
+                LeafNode(None, f" ({len(entries)})"),
+            ],
+        )
+        for tag, entries in tags.items()
+    ]
+    return ParentNode("div", [LeafNode("h1", "Tags"), ParentNode("ul", items)])
+
+
+def listing_pages(
+    index: MetadataIndex, archive_size: int = ARCHIVE_SIZE
+) -> list[tuple[str, str, ParentNode]]:
+    # (output, title, content) for the archive and tag pages, built from the
+    # index alone: sorting and paging happen in memory, no source is re-read.
+    pages = []
+    # The home page links to the archive rather than being listed in it.
+    listed = [entry for entry in index.published() if entry.output != "index.html"]
+    archive = paginate(listed, archive_size)
+    for number, entries in enumerate(archive, start=1):
+        title = "Archive" if number == 1 else f"Archive, page {number}"
+        newer = archive_path(number - 1) if number > 1 else None
+        older = archive_path(number + 1) if number < len(archive) else None
+        output = archive_path(number)
+        pages.append((output, title, listing_node(title, entries, newer, older)))
+
+    tags = index.tags()
+    slugs = tag_slugs(tags)
+    if tags:
+        pages.append(("tags/index.html", "Tags", tags_node(tags, slugs)))
+    for tag, entries in tags.items():
+        title = f"Tagged {tag}"
+        pages.append((tag_path(slugs[tag]), title, listing_node(title, entries)))
+    return pages
+
+
+def sitemap_xml(index: MetadataIndex, base_url: str, outputs: list[str]) -> str:
+    base_url = base_url.rstrip("/")
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        f'<urlset xmlns="{SITEMAP_NAMESPACE}">',
+    ]
+    entries = sorted(index.published(), key=lambda entry: entry.output)
+    dates = {entry.output: entry.date for entry in entries}
+    for output in [entry.output for entry in entries] + outputs:
+        lines.append("  <url>")
+        lines.append(f"    <loc>{escape_text(base_url + page_url(output))}</loc>")
+        if dates.get(output):
+            lines.append(f"    <lastmod>{dates[output]}</lastmod>")
+        lines.append("  </url>")
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+
+def atom_timestamp(date: str) -> str:
+    return f"{date}T00:00:00Z"
+
+
+def atom_feed(
+    index: MetadataIndex, base_url: str, feed_size: int = FEED_SIZE
+) -> str | None:
+    entries = [entry for entry in index.published() if entry.date][:feed_size]
+    if not entries:
+        return None
+
+    base_url = base_url.rstrip("/")
+    home = next(
+        (entry for entry in index.pages.values() if entry.output == "index.html"),
+        None,
+    )
+    title = home.title if home is not None else base_url
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        f'<feed xmlns="{ATOM_NAMESPACE}">',
+        f"  <title>{escape_text(title)}</title>",
+        f"  <id>{escape_text(base_url)}/</id>",
+        f'  <link href="{escape_attribute(base_url)}/atom.xml" rel="self"/>',
+        f'  <link href="{escape_attribute(base_url)}/"/>',
+        f"  <updated>{atom_timestamp(entries[0].date)}</updated>",
+    ]
+    for entry in entries:
+        url = base_url + page_url(entry.output)
+        lines += [
+            "  <entry>",
+            f"    <title>{escape_text(entry.title)}</title>",
+            f"    <id>{escape_text(url)}</id>",
+            f'    <link href="{escape_attribute(url)}"/>',
+            f"    <updated>{atom_timestamp(entry.date)}</updated>",
+        ]
+        lines += [
+            f'    <category term="{escape_attribute(tag)}"/>' for tag in entry.tags
+        ]
+        lines.append("  </entry>")
+    lines.append("</feed>")
+    return "\n".join(lines) + "\n"
+
+
+def write_aggregates(
+    index: MetadataIndex,
+    template_path: str,
+    dest_dir_path: str,
+    base_url: str = None,
+    archive_size: int = ARCHIVE_SIZE,
+    feed_size: int = FEED_SIZE,
+    atomic_writes: bool = False,
+) -> list[str]:
+    template = load_template(template_path)
+    pages = listing_pages(index, archive_size)
+    files = {
+        output: template.render({"Title": escape_text(title), "Content": content})
+        for output, title, content in pages
+    }
+    if base_url:
+        files["sitemap.xml"] = sitemap_xml(index, base_url, list(files))
+        feed = atom_feed(index, base_url, feed_size)
+        if feed is not None:
+            files["atom.xml"] = feed
+
+    dest_paths = {
+        output: os.path.join(dest_dir_path, *output.split("/")) for output in files
+    }
+    create_output_dirs(dest_paths.values())
+    for output, text in files.items():
+        print(f"Generating {dest_paths[output]}")
+        write_output(dest_paths[output], text, atomic_writes, create_dirs=False)
+    return list(files)
@@ -0,0 +1,277 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable
+
+from block_cache import BlockCache
+from depgraph import DependencyGraph, record_pages
+from generate_page import (
+    STREAM_THRESHOLD,
+    BuildError,
+    _init_worker,
+    _render_in_worker,
+    collect_pages,
+    log_page,
+    render_markdown,
+    stream_page,
+)
+from metadata import MetadataIndex, index_pages
+from output_io import create_output_dirs, write_output
+from render_cache import RenderCache
+from source_io import MMAP_THRESHOLD, read_source
+from template import Template, load_template
+
+IO_WORKERS = 4
+QUEUE_SIZE = 16
+
+# The queues carry (from_path, dest_path, payload) items; None tells the next
+# stage that the one before it has finished.
+PipelineItem = tuple[str, str, str | None] | None
+
+
+def read_page(from_path: str, stream_threshold: int, mmap_threshold: int) -> str | None:
+    # Streamed pages do their own I/O inside the render stage.
+    if os.path.getsize(from_path) >= stream_threshold:
+        return None
+    return read_source(from_path, mmap_threshold)
+
+
+async def run_stage(
+    workers: int,
+    worker: Callable[[], Awaitable[None]],
+    out_queue: asyncio.Queue,
+    consumers: int,
+) -> None:
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    for _ in range(consumers):
+        await out_queue.put(None)
+
+
+async def run_pipeline(
+    pages: list[tuple[str, str]],
+    templates: dict[str, str],
+    loaded_templates: dict[str, Template],
+    render_executor: Executor,
+    render: Callable[[str, str], tuple[str, dict, dict]],
+    render_workers: int,
+    io_workers: int = IO_WORKERS,
+    queue_size: int = QUEUE_SIZE,
+    cache: BlockCache = None,
+    render_cache: RenderCache = None,
+    stream_threshold: int = STREAM_THRESHOLD,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    atomic_writes: bool = False,
+) -> dict[str, Exception]:
+    loop = asyncio.get_running_loop()
+    read_queue: asyncio.Queue[PipelineItem] = asyncio.Queue(queue_size)
+    write_queue: asyncio.Queue[PipelineItem] = asyncio.Queue(queue_size)
+    pending = iter(pages)
+    failures = {}
+
+    with ThreadPoolExecutor(io_workers) as io_executor:
+
+        async def read() -> None:
+            for from_path, dest_path in pending:
+                try:
+                    markdown = await loop.run_in_executor(
+                        io_executor,
+                        read_page,
+                        from_path,
+                        stream_threshold,
+                        mmap_threshold,
+                    )
+                except Exception as e:
+                    failures[from_path] = e
+                    continue
+                await read_queue.put((from_path, dest_path, markdown))
+
+        async def render_stage() -> None:
+            while (item := await read_queue.get()) is not None:
+                from_path, dest_path, markdown = item
+                try:
+                    if markdown is None:
+                        await loop.run_in_executor(
+                            render_executor,
+                            partial(
+                                stream_page,
+                                from_path,
+                                loaded_templates[templates[from_path]],
+                                dest_path,
+                                mmap_threshold=mmap_threshold,
+                                atomic_writes=atomic_writes,
+                                create_dirs=False,
+                            ),
+                        )
+                        html = None
+                    else:
+                        result = await loop.run_in_executor(
+                            render_executor, render, markdown, templates[from_path]
+                        )
+                        html, cache_updates, render_updates = result
+                        if cache_updates is not None:
+                            cache.apply_updates(cache_updates)
+                        if render_updates is not None:
+                            render_cache.apply_updates(render_updates)
+                except Exception as e:
+                    failures[from_path] = e
+                    continue
+                await write_queue.put((from_path, dest_path, html))
+
+        async def write() -> None:
+            while (item := await write_queue.get()) is not None:
+                from_path, dest_path, html = item
+                try:
+                    if html is not None:
+                        await loop.run_in_executor(
+                            io_executor,
+                            partial(
+                                write_output,
+                                dest_path,
+                                html,
+                                atomic_writes,
+                                create_dirs=False,
+                            ),
+                        )
+                except Exception as e:
+                    failures[from_path] = e
+
+        await asyncio.gather(
+            run_stage(io_workers, read, read_queue, render_workers),
+            run_stage(render_workers, render_stage, write_queue, io_workers),
+            asyncio.gather(*(write() for _ in range(io_workers))),
+        )
+    return failures
+
+
+def render_pages_async(
+    pages: list[tuple[str, str]],
+    template_path: str,
+    workers: int = 1,
+    io_workers: int = IO_WORKERS,
+    queue_size: int = QUEUE_SIZE,
+    cache: BlockCache = None,
+    render_cache: RenderCache = None,
+    stream_threshold: int = STREAM_THRESHOLD,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    atomic_writes: bool = False,
+    templates: dict[str, str] = None,
+) -> None:
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    templates = templates or {}
+    template_paths = {
+        from_path: templates.get(from_path, template_path) for from_path, _ in pages
+    }
+    loaded_templates = {
+        path: load_template(path) for path in sorted(set(template_paths.values()))
+    }
+    create_output_dirs(dest_path for _, dest_path in pages)
+
+    # A single render thread shares the caches directly; worker processes get
+    # copies and send back what they learned with every page.
+    if workers == 1:
+        render_executor = ThreadPoolExecutor(1)
+
+        def render_one(markdown: str, template_path: str) -> tuple[str, None, None]:
+            html = render_markdown(
+                markdown,
+                loaded_templates[template_path],
+                cache=cache,
+                render_cache=render_cache,
+            )
+            return html, None, None
+
+    else:
+        if render_cache is not None:
+            render_cache.create()
+        render_executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(cache, render_cache, loaded_templates),
+        )
+        render_one = _render_in_worker
+
+    with render_executor:
+        failures = asyncio.run(
+            run_pipeline(
+                pages,
+                template_paths,
+                loaded_templates,
+                render_executor,
+                render_one,
+                workers,
+                io_workers,
+                queue_size,
+                cache,
+                render_cache,
+                stream_threshold,
+                mmap_threshold,
+                atomic_writes,
+            )
+        )
+
+    for from_path, dest_path in pages:
+        log_page(from_path, template_paths[from_path], dest_path)
+    if failures:
+        raise BuildError(
+            [
+                (from_path, failures[from_path])
+                for from_path, _ in pages
+                if from_path in failures
+            ]
+        )
+
+
+def generate_pages_async(
+    dir_path_content: str,
+    template_path: str,
+    dest_dir_path: str,
+    workers: int = 1,
+    io_workers: int = IO_WORKERS,
+    queue_size: int = QUEUE_SIZE,
+    cache: BlockCache = None,
+    render_cache: RenderCache = None,
+    stream_threshold: int = STREAM_THRESHOLD,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    atomic_writes: bool = False,
+    graph: DependencyGraph = None,
+    metadata: MetadataIndex = None,
+) -> list[str]:
+    pages = collect_pages(dir_path_content, dest_dir_path)
+    templates = None
+    failures = []
+    if metadata is not None:
+        metadata.remove_missing({from_path for from_path, _ in pages})
+        pages, failures = index_pages(metadata, pages, dest_dir_path, mmap_threshold)
+        templates = metadata.templates(template_path)
+    if graph is not None:
+        reasons = dict.fromkeys((from_path for from_path, _ in pages), "full build")
+        record_pages(
+            graph,
+            pages,
+            dest_dir_path,
+            template_path,
+            reasons,
+            mmap_threshold,
+            templates,
+        )
+    try:
+        render_pages_async(
+            pages,
+            template_path,
+            workers,
+            io_workers,
+            queue_size,
+            cache,
+            render_cache,
+            stream_threshold,
+            mmap_threshold,
+            atomic_writes,
+            templates,
+        )
+    except BuildError as e:
+        failures += e.failures
+    if failures:
+        raise BuildError(failures)
+    return [dest_path for _, dest_path in pages]
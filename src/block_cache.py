@@ -0,0 +1,96 @@
+import os
+import pickle
+from collections import OrderedDict
+
+from htmlnode import HTMLNode
+from manifest import GENERATOR_VERSION
+
+
+class BlockCache:
+    def __init__(self, maxsize: int = 4096, persistent: bool = False) -> None:
+        self.maxsize = maxsize
+        # Only a cache that is saved after the build needs the blocks parsed in
+        # worker processes; otherwise workers report their hit and miss counts.
+        self.persistent = persistent
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str], HTMLNode] = OrderedDict()
+        self._added: dict[tuple[str, str], HTMLNode] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, block_type: str, block: str) -> HTMLNode | None:
+        key = (block_type, block)
+        node = self._entries.get(key)
+        if node is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return node
+
+    def put(self, block_type: str, block: str, node: HTMLNode) -> None:
+        key = (block_type, block)
+        self._entries[key] = node
+        self._entries.move_to_end(key)
+        if self.persistent:
+            self._added[key] = node
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> str:
+        return (
+            f"{self.hits} hit(s), {self.misses} miss(es)"
+            f" ({self.hit_rate:.0%} hit rate, {len(self)} cached block(s))"
+        )
+
+    # Worker processes each own a copy of the cache; they hand what they learned
+    # back to the parent after every page so the parent can report it, and
+    # persist it if the cache is saved.
+    def take_updates(self) -> dict:
+        updates = {"entries": self._added, "hits": self.hits, "misses": self.misses}
+        self._added = {}
+        self.hits = self.misses = 0
+        return updates
+
+    def apply_updates(self, updates: dict) -> None:
+        self.hits += updates["hits"]
+        self.misses += updates["misses"]
+        for (block_type, block), node in updates["entries"].items():
+            self.put(block_type, block, node)
+        self._added = {}
+
+    @classmethod
+    def load(cls, path: str, maxsize: int = 4096) -> "BlockCache":
+        cache = cls(maxsize, persistent=True)
+        if not os.path.exists(path):
+            return cache
+
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return cache
+
+        if data.get("generator") == GENERATOR_VERSION:
+            for (block_type, block), node in data["entries"]:
+                cache.put(block_type, block, node)
+        cache._added = {}
+        return cache
+
+    def save(self, path: str) -> None:
+        dir_path = os.path.dirname(path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+
+        data = {"generator": GENERATOR_VERSION, "entries": list(self._entries.items())}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
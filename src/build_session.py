@@ -0,0 +1,307 @@
+import os
+import shutil
+
+from aggregate import ARCHIVE_SIZE, write_aggregates
+from async_build import IO_WORKERS, generate_pages_async
+from block_cache import BlockCache
+from copytree import copytree, sync_tree
+from depgraph import DependencyGraph, record_pages, site_path
+from dev_server import DevSession
+from generate_page import (
+    STREAM_THRESHOLD,
+    generate_pages_incremental,
+    generate_pages_recursive,
+    page_dest_path,
+    render_markdown,
+)
+from manifest import Manifest, hash_file
+from metadata import MetadataIndex
+from profiler import NULL_PROFILER, BuildProfiler
+from render_cache import RenderCache
+from source_io import MMAP_THRESHOLD, read_source
+from template import Template, load_template
+from validate import validate_site
+
+
+class BuildSession:
+    # Holds a site's configuration, caches and loaded template between calls, so
+    # a long-running process can render and rebuild without starting over.
+    def __init__(
+        self,
+        content_dir: str = "./content",
+        static_dir: str = "./static",
+        dest_dir: str = "./public",
+        template_path: str = "./template.html",
+        incremental: bool = False,
+        manifest_path: str = "./.cache/manifest.json",
+        depgraph_path: str = "./.cache/depgraph.json",
+        metadata_path: str = "./.cache/metadata.json",
+        checksum: bool = False,
+        link: str = "copy",
+        copy_workers: int = None,
+        workers: int = 1,
+        pipeline: bool = False,
+        io_workers: int = IO_WORKERS,
+        stream_threshold: int = STREAM_THRESHOLD,
+        mmap_threshold: int = MMAP_THRESHOLD,
+        atomic_writes: bool = False,
+        aggregate: bool = False,
+        base_url: str = None,
+        archive_size: int = ARCHIVE_SIZE,
+        profiler: BuildProfiler = NULL_PROFILER,
+        cache: BlockCache = None,
+        render_cache: RenderCache = None,
+    ) -> None:
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.dest_dir = dest_dir
+        self.template_path = template_path
+        self.incremental = incremental
+        self.manifest_path = manifest_path
+        self.depgraph_path = depgraph_path
+        self.metadata_path = metadata_path
+        self.checksum = checksum
+        self.link = link
+        self.copy_workers = copy_workers
+        self.workers = workers
+        self.pipeline = pipeline
+        self.io_workers = io_workers
+        self.stream_threshold = stream_threshold
+        self.mmap_threshold = mmap_threshold
+        self.atomic_writes = atomic_writes
+        self.aggregate = aggregate
+        self.base_url = base_url
+        self.archive_size = archive_size
+        self.profiler = profiler
+        self.cache = cache
+        self.render_cache = render_cache
+
+        self.manifest = None
+        self.aggregates: list[str] = []
+        # Full builds don't need the dependency graph; validate() builds it from
+        # the metadata index if asked.
+        self.graph = None
+        if incremental:
+            self.manifest = Manifest.load(manifest_path)
+            self.graph = DependencyGraph.load(depgraph_path)
+            self.metadata = MetadataIndex.load(metadata_path)
+        else:
+            self.metadata = MetadataIndex(metadata_path)
+
+    @property
+    def template(self) -> Template:
+        return load_template(self.template_path)
+
+    def source_path(self, path: str) -> str:
+        if os.path.exists(path):
+            return path
+        return os.path.join(self.content_dir, path)
+
+    # Previews leave the site's state alone: render_string never stores its
+    # output in the render cache, and render_page reads the page's header into
+    # an index of its own. Only the build methods update self.metadata.
+    def render_string(self, markdown: str) -> str:
+        return render_markdown(markdown, self.template, cache=self.cache)
+
+    def render_page(self, path: str) -> str:
+        # The page's header is re-read so a template named in its front matter
+        # is used, as in a build.
+        source = self.source_path(path)
+        dest_path = page_dest_path(source, self.content_dir, self.dest_dir)
+        preview = MetadataIndex()
+        preview.update(source, site_path(dest_path, self.dest_dir), self.mmap_threshold)
+        template_path = preview.templates(self.template_path).get(
+            source, self.template_path
+        )
+        markdown = read_source(source, self.mmap_threshold)
+        return render_markdown(
+            markdown,
+            load_template(template_path),
+            cache=self.cache,
+            render_cache=self.render_cache,
+        )
+
+    def build(self) -> list[str]:
+        try:
+            if self.incremental:
+                return self.build_incremental()
+            return self.build_full()
+        finally:
+            # Pages rendered during the build are written in one transaction.
+            if self.render_cache is not None:
+                self.render_cache.flush()
+
+    def build_full(self) -> list[str]:
+        print("Deleting public directory...")
+        if os.path.exists(self.dest_dir):
+            shutil.rmtree(self.dest_dir)
+
+        print("Copying static files to public directory...")
+        with self.profiler.stage("static_copy"):
+            stats = copytree(self.static_dir, self.dest_dir, self.copy_workers)
+        print(f"Copied {stats.report()}")
+
+        self.graph = None
+        self.metadata = MetadataIndex(self.metadata_path)
+        try:
+            if self.pipeline:
+                generated = generate_pages_async(
+                    self.content_dir,
+                    self.template_path,
+                    self.dest_dir,
+                    self.workers,
+                    self.io_workers,
+                    cache=self.cache,
+                    render_cache=self.render_cache,
+                    stream_threshold=self.stream_threshold,
+                    mmap_threshold=self.mmap_threshold,
+                    atomic_writes=self.atomic_writes,
+                    graph=self.graph,
+                    metadata=self.metadata,
+                )
+            else:
+                generated = generate_pages_recursive(
+                    self.content_dir,
+                    self.template_path,
+                    self.dest_dir,
+                    self.workers,
+                    self.profiler,
+                    self.cache,
+                    self.render_cache,
+                    self.stream_threshold,
+                    self.mmap_threshold,
+                    self.atomic_writes,
+                    self.graph,
+                    self.metadata,
+                )
+            if self.aggregate:
+                self.build_aggregates()
+        finally:
+            self.metadata.save()
+        return generated
+
+    def build_incremental(self) -> list[str]:
+        print("Syncing static files to public directory...")
+        with self.profiler.stage("static_copy"):
+            self.manifest.assets, stats = sync_tree(
+                self.static_dir,
+                self.dest_dir,
+                self.manifest.assets,
+                self.checksum,
+                self.link,
+                self.copy_workers,
+            )
+        print(f"Updated {stats.report()}")
+
+        try:
+            generated = generate_pages_incremental(
+                self.content_dir,
+                self.template_path,
+                self.dest_dir,
+                self.manifest,
+                self.workers,
+                self.profiler,
+                self.cache,
+                self.render_cache,
+                self.stream_threshold,
+                self.mmap_threshold,
+                self.atomic_writes,
+                self.graph,
+                self.metadata,
+            )
+            if self.aggregate:
+                self.build_aggregates()
+        finally:
+            self.save()
+        print(f"Incremental build: {len(generated)} page(s) regenerated.")
+        return generated
+
+    def build_aggregates(self) -> list[str]:
+        # Listing, tag, sitemap and feed files come from the metadata index the
+        # page walk just filled, so no source is parsed a second time.
+        self.aggregates = write_aggregates(
+            self.metadata,
+            self.template_path,
+            self.dest_dir,
+            self.base_url,
+            self.archive_size,
+            atomic_writes=self.atomic_writes,
+        )
+        if self.manifest is not None:
+            for output in sorted(self.manifest.aggregates - set(self.aggregates)):
+                dest_path = os.path.join(self.dest_dir, *output.split("/"))
+                if os.path.exists(dest_path):
+                    print(f"Removing stale page {dest_path}")
+                    os.remove(dest_path)
+            self.manifest.aggregates = set(self.aggregates)
+        return self.aggregates
+
+    def validate(self) -> None:
+        if self.graph is None:
+            self.graph = DependencyGraph(self.depgraph_path)
+            pages = [
+                (entry.source, os.path.join(self.dest_dir, *entry.output.split("/")))
+                for entry in self.metadata.published()
+            ]
+            record_pages(
+                self.graph,
+                pages,
+                self.dest_dir,
+                self.template_path,
+                dict.fromkeys((from_path for from_path, _ in pages), "full build"),
+                self.mmap_threshold,
+                self.metadata.templates(self.template_path),
+            )
+            self.graph.save()
+        validate_site(self.graph, self.static_dir, self.aggregates)
+
+    def explain(self, query: str) -> list[str]:
+        graph = DependencyGraph.load(self.depgraph_path)
+        rel_path = os.path.relpath(query, self.dest_dir)
+        if not rel_path.startswith(os.pardir):
+            query = site_path(query, self.dest_dir)
+
+        source = graph.find(query)
+        current_reason = None
+        if source is not None:
+            if not os.path.isfile(source):
+                current_reason = "source deleted"
+            else:
+                dest_path = page_dest_path(source, self.content_dir, self.dest_dir)
+                templates = MetadataIndex.load(self.metadata_path).templates(
+                    self.template_path
+                )
+                template_path = templates.get(source, self.template_path)
+                current_reason = Manifest.load(self.manifest_path).stale_reason(
+                    source, hash_file(source), hash_file(template_path), dest_path
+                )
+        return graph.explain(query, current_reason)
+
+    def dev_session(self) -> DevSession:
+        return DevSession(
+            self.content_dir,
+            self.static_dir,
+            self.template_path,
+            self.dest_dir,
+            self.manifest,
+            self.workers,
+            self.link,
+            self.cache,
+            self.stream_threshold,
+            self.mmap_threshold,
+            self.atomic_writes,
+            self.graph,
+            self.metadata,
+            self.build_aggregates if self.aggregate else None,
+        )
+
+    def save(self) -> None:
+        if self.manifest is not None:
+            self.manifest.save()
+        if self.graph is not None:
+            self.graph.save()
+        self.metadata.save()
+
+    def close(self) -> None:
+        if self.render_cache is not None:
+            self.render_cache.close()
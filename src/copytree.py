@@ -1,19 +1,249 @@
+import errno
+import fcntl
 import os
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from manifest import hash_file
 
+LINK_MODES = ("copy", "hardlink", "reflink")
 
-def copytree(src_dir: str, dest_dir: str) -> None:
+# ioctl request that clones a file's extents on copy-on-write filesystems
+# (btrfs, xfs, ...), see ioctl_ficlone(2).
+FICLONE = 0x40049409
+
+# Errors meaning "this kernel/filesystem can't do that transfer", after which the
+# next, more portable method is tried.
+UNSUPPORTED_ERRNOS = {
+    errno.ENOSYS,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.EBADF,
+}
+
+MAX_TRANSFER = 1 << 30
+
+
+class CopyStats:
+    def __init__(self) -> None:
+        self.files = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.paths: list[str] = []
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def add(self, rel_path: str, size: int) -> None:
+        self.files += 1
+        self.bytes += size
+        self.paths.append(rel_path)
+
+    def report(self) -> str:
+        return (
+            f"{self.files} file(s), {self.bytes / 1e6:.1f} MB in {self.seconds:.2f}s"
+            f" ({self.bytes_per_second / 1e6:.1f} MB/s)"
+        )
+
+    def __repr__(self) -> str:
+        return f"CopyStats({self.report()})"
+
+
+def _copy_file_range(src_fd: int, dest_fd: int, offset: int, count: int) -> int:
+    return os.copy_file_range(src_fd, dest_fd, count, offset, offset)
+
+
+def _sendfile(src_fd: int, dest_fd: int, offset: int, count: int) -> int:
+    os.lseek(dest_fd, offset, os.SEEK_SET)
+    return os.sendfile(dest_fd, src_fd, offset, count)
+
+
+ZERO_COPY_METHODS = [
+    method
+    for method, name in ((_copy_file_range, "copy_file_range"), (_sendfile, "sendfile"))
+    if hasattr(os, name)
+]
+
+
+def copy_file(src_path: str, dest_path: str) -> int:
+    with open(src_path, "rb") as src, open(dest_path, "wb") as dest:
+        src_fd, dest_fd = src.fileno(), dest.fileno()
+        size = os.fstat(src_fd).st_size
+        offset = 0
+
+        # Let the kernel move the bytes, starting with copy_file_range (which
+        # can also reflink or copy server-side), then sendfile, then userspace.
+        for method in ZERO_COPY_METHODS:
+            try:
+                while offset < size:
+                    count = min(size - offset, MAX_TRANSFER)
+                    sent = method(src_fd, dest_fd, offset, count)
+                    if sent == 0:
+                        # Nothing moved short of the end: the method can't
+                        # handle this file, so the next one takes over.
+                        break
+                    offset += sent
+                else:
+                    break
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_ERRNOS:
+                    raise
+        else:
+            src.seek(offset)
+            dest.seek(offset)
+            shutil.copyfileobj(src, dest)
+            offset = dest.tell()
+
+    shutil.copymode(src_path, dest_path)
+    return offset
+
+
+def scan_tree(src_dir: str, dest_dir: str) -> list[str]:
     if not os.path.exists(src_dir):
         raise ValueError("Source directory does not exist!")
 
-    if not os.path.exists(dest_dir):
-        os.mkdir(dest_dir)
+    files = []
+    pending = [""]
+    while pending:
+        rel_dir = pending.pop()
+        os.makedirs(os.path.join(dest_dir, rel_dir), exist_ok=True)
+        with os.scandir(os.path.join(src_dir, rel_dir)) as entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name)
+                if entry.is_file():
+                    files.append(rel_path)
+                else:
+                    pending.append(rel_path)
+    return sorted(files)
 
-    for filename in os.listdir(src_dir):
-        file_path = os.path.join(src_dir, filename)
-        dest_path = os.path.join(dest_dir, filename)
 
-        if os.path.isfile(file_path):
-            shutil.copy(file_path, dest_path)
-        else:
-            copytree(file_path, dest_path)
+def run_file_jobs(
+    job: Callable[[str], int | None],
+    rel_paths: list[str],
+    workers: int = None,
+    progress: Callable[[CopyStats], None] = None,
+) -> CopyStats:
+    stats = CopyStats()
+    start = time.perf_counter()
+
+    def record(rel_path: str, size: int | None) -> None:
+        if size is not None:
+            stats.add(rel_path, size)
+            stats.seconds = time.perf_counter() - start
+            if progress is not None:
+                progress(stats)
+
+    if workers == 1:
+        for rel_path in rel_paths:
+            record(rel_path, job(rel_path))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for rel_path, size in zip(rel_paths, executor.map(job, rel_paths)):
+                record(rel_path, size)
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def copytree(
+    src_dir: str,
+    dest_dir: str,
+    workers: int = None,
+    progress: Callable[[CopyStats], None] = None,
+) -> CopyStats:
+    rel_paths = scan_tree(src_dir, dest_dir)
+
+    def copy(rel_path: str) -> int:
+        return copy_file(
+            os.path.join(src_dir, rel_path), os.path.join(dest_dir, rel_path)
+        )
+
+    return run_file_jobs(copy, rel_paths, workers, progress)
+
+
+def is_unchanged(src_path: str, dest_path: str, checksum: bool = False) -> bool:
+    try:
+        src_stat = os.stat(src_path)
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+
+    if (src_stat.st_dev, src_stat.st_ino) == (dest_stat.st_dev, dest_stat.st_ino):
+        return True
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if checksum:
+        return hash_file(src_path) == hash_file(dest_path)
+    return int(src_stat.st_mtime) == int(dest_stat.st_mtime)
+
+
+def reflink_file(src_path: str, dest_path: str) -> None:
+    with open(src_path, "rb") as src, open(dest_path, "wb") as dest:
+        fcntl.ioctl(dest.fileno(), FICLONE, src.fileno())
+    shutil.copystat(src_path, dest_path)
+
+
+def place_file(src_path: str, dest_path: str, link: str = "copy") -> int:
+    if link not in LINK_MODES:
+        raise ValueError(f"Unknown link mode: {link}")
+
+    if os.path.lexists(dest_path):
+        os.remove(dest_path)
+
+    # Hardlinks fail across devices and reflinks on filesystems without
+    # copy-on-write support; both fall back to a regular copy.
+    if link == "hardlink":
+        try:
+            os.link(src_path, dest_path)
+            return os.path.getsize(dest_path)
+        except OSError:
+            pass
+    elif link == "reflink":
+        try:
+            reflink_file(src_path, dest_path)
+            return os.path.getsize(dest_path)
+        except OSError:
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+
+    size = copy_file(src_path, dest_path)
+    shutil.copystat(src_path, dest_path)
+    return size
+
+
+def sync_tree(
+    src_dir: str,
+    dest_dir: str,
+    previous: set[str] = None,
+    checksum: bool = False,
+    link: str = "copy",
+    workers: int = None,
+    progress: Callable[[CopyStats], None] = None,
+) -> tuple[set[str], CopyStats]:
+    if link not in LINK_MODES:
+        raise ValueError(f"Unknown link mode: {link}")
+
+    rel_paths = scan_tree(src_dir, dest_dir)
+
+    def sync(rel_path: str) -> int | None:
+        src_path = os.path.join(src_dir, rel_path)
+        dest_path = os.path.join(dest_dir, rel_path)
+        if is_unchanged(src_path, dest_path, checksum):
+            return None
+        return place_file(src_path, dest_path, link)
+
+    stats = run_file_jobs(sync, rel_paths, workers, progress)
+
+    # Only files recorded by a previous sync are removed, so generated pages that
+    # share the output directory are left alone.
+    synced = set(rel_paths)
+    for rel_path in sorted((previous or set()) - synced):
+        dest_path = os.path.join(dest_dir, rel_path)
+        if os.path.lexists(dest_path):
+            os.remove(dest_path)
+
+    return synced, stats
@@ -0,0 +1,200 @@
+import json
+import os
+import posixpath
+import urllib.parse
+from contextlib import closing
+from typing import Iterable, NamedTuple
+
+from manifest import GENERATOR_VERSION
+from markdown_parser import inline_segments, scan_numbered_blocks
+from output_io import open_output
+from source_io import MMAP_THRESHOLD, iter_source_lines
+from split_textnode import scan_inline
+from textnode import TextType
+
+
+class Reference(NamedTuple):
+    kind: str
+    target: str
+    line: int
+
+
+def extract_references(lines: Iterable[str]) -> list[Reference]:
+    # Links and images are the LINK and IMAGE nodes the inline parser produces,
+    # so anything inside a code block or code span is not a reference.
+    references = []
+    for start, block, block_type in scan_numbered_blocks(lines):
+        for offset, text in inline_segments(block, block_type):
+            if "](" not in text:
+                continue
+            joined = text.replace("\n", " ") if block_type == "paragraph" else text
+            try:
+                nodes = list(scan_inline(joined))
+            except Exception:
+                # The page fails to render anyway; that is reported there.
+                continue
+
+            for position, node in nodes:
+                if node.text_type in (TextType.LINK, TextType.IMAGE):
+                    kind = "image" if node.text_type == TextType.IMAGE else "link"
+                    number = start + offset + text.count("\n", 0, position)
+                    references.append(Reference(kind, node.url, number))
+    return references
+
+
+def site_path(dest_path: str, dest_dir_path: str) -> str:
+    rel_path = os.path.relpath(dest_path, dest_dir_path)
+    return rel_path.replace(os.sep, "/")
+
+
+def reference_path(target: str, page_path: str) -> str | None:
+    # Maps a link or image target to the output file it points at, relative to
+    # the site root; external URLs and same-page anchors map to None.
+    url = urllib.parse.urlsplit(target)
+    if url.scheme or url.netloc or not url.path:
+        return None
+
+    path = urllib.parse.unquote(url.path)
+    if path.startswith("/"):
+        resolved = path.lstrip("/")
+    else:
+        resolved = posixpath.join(posixpath.dirname(page_path), path)
+    resolved = posixpath.normpath(resolved)
+    if resolved == ".":
+        resolved = ""
+
+    # Directory URLs and extensionless URLs are served by their index page.
+    if path.endswith("/") or not posixpath.splitext(resolved)[1]:
+        return posixpath.join(resolved, "index.html")
+    return resolved
+
+
+def is_page_path(path: str) -> bool:
+    return path.endswith(".html")
+
+
+class DependencyGraph:
+    def __init__(self, path: str = None) -> None:
+        self.path = path
+        self.pages: dict[str, dict] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "DependencyGraph":
+        graph = cls(path)
+        if not os.path.exists(path):
+            return graph
+
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("generator") == GENERATOR_VERSION:
+            graph.pages = data.get("pages", {})
+        return graph
+
+    def save(self, path: str = None) -> None:
+        path = path or self.path
+        if not path:
+            raise ValueError("Dependency graph has no path to save to.")
+
+        data = {"generator": GENERATOR_VERSION, "pages": self.pages}
+        with open_output(path, atomic=True) as f:
+            # Compact: the graph is only read back by the generator.
+            json.dump(data, f, separators=(",", ":"))
+
+    def record(
+        self,
+        source: str,
+        output: str,
+        template: str,
+        references: list[Reference],
+        reason: str,
+    ) -> None:
+        internal = []
+        for ref in references:
+            path = reference_path(ref.target, output)
+            if path is not None:
+                internal.append([ref.line, ref.kind, ref.target, path])
+        targets = {path for *_, path in internal}
+        self.pages[source] = {
+            "output": output,
+            "template": os.path.normpath(template),
+            "assets": sorted(t for t in targets if not is_page_path(t)),
+            "links": sorted(t for t in targets if is_page_path(t)),
+            "references": internal,
+            "reason": reason,
+        }
+
+    def update(
+        self,
+        source: str,
+        output: str,
+        template: str,
+        reason: str,
+        mmap_threshold: int = MMAP_THRESHOLD,
+    ) -> None:
+        with closing(iter_source_lines(source, mmap_threshold)) as lines:
+            references = extract_references(lines)
+        self.record(source, output, template, references, reason)
+
+    def remove_missing(self, sources: set[str]) -> None:
+        for source in set(self.pages) - sources:
+            del self.pages[source]
+
+    def find(self, query: str) -> str | None:
+        query_path = os.path.normpath(query)
+        for source, entry in self.pages.items():
+            if os.path.normpath(source) == query_path or entry["output"] == query:
+                return source
+        return None
+
+    def dependents(self, path: str) -> list[str]:
+        # path is a template file, a site-relative asset or output, or a source.
+        source = self.find(path)
+        target = self.pages[source]["output"] if source is not None else path
+        template = os.path.normpath(path)
+        return sorted(
+            page
+            for page, entry in self.pages.items()
+            if entry["template"] == template
+            or target in entry["assets"]
+            or target in entry["links"]
+        )
+
+    def explain(self, query: str, current_reason: str | None = None) -> list[str]:
+        source = self.find(query)
+        if source is None:
+            return [f"{query} was not part of the last build."]
+
+        entry = self.pages[source]
+        lines = [
+            f"{source} -> {entry['output']}",
+            f"  template: {entry['template']}",
+            f"  assets: {', '.join(entry['assets']) or '(none)'}",
+            f"  links to: {', '.join(entry['links']) or '(none)'}",
+            f"  linked from: {', '.join(self.dependents(source)) or '(none)'}",
+            f"  last rebuilt because: {entry['reason']}",
+        ]
+        if current_reason is not None:
+            lines.append(f"  next incremental build: rebuild ({current_reason})")
+        else:
+            lines.append("  next incremental build: up to date")
+        return lines
+
+
+def record_pages(
+    graph: DependencyGraph,
+    pages: list[tuple[str, str]],
+    dest_dir_path: str,
+    template_path: str,
+    reasons: dict[str, str],
+    mmap_threshold: int = MMAP_THRESHOLD,
+    templates: dict[str, str] = None,
+) -> None:
+    templates = templates or {}
+    for from_path, dest_path in pages:
+        graph.update(
+            from_path,
+            site_path(dest_path, dest_dir_path),
+            templates.get(from_path, template_path),
+            reasons[from_path],
+            mmap_threshold,
+        )
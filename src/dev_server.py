@@ -0,0 +1,322 @@
+import os
+import threading
+import urllib.parse
+from functools import partial
+from typing import Callable
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from block_cache import BlockCache
+from copytree import place_file
+from depgraph import DependencyGraph, record_pages
+from generate_page import (
+    STREAM_THRESHOLD,
+    collect_pages,
+    iter_render_results,
+    page_dest_path,
+)
+from manifest import Manifest, hash_file
+from metadata import MetadataIndex, index_pages
+from source_io import MMAP_THRESHOLD
+
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_TIMEOUT = 25.0
+LIVE_RELOAD_SCRIPT = (
+    "<script>(function () {"
+    "  var seen = null;"
+    "  function poll() {"
+    f'    fetch("{LIVE_RELOAD_PATH}?v=" + (seen === null ? "" : seen))'
+    "      .then(function (r) { return r.text(); })"
+    "      .then(function (v) {"
+    "        if (seen !== null && v !== seen) { location.reload(); return; }"
+    "        seen = v; poll();"
+    "      })"
+    "      .catch(function () { setTimeout(poll, 1000); });"
+    "  }"
+    "  poll();"
+    "})();</script>"
+)
+
+
+class LiveReload:
+    def __init__(self) -> None:
+        self.version = 0
+        self._changed = threading.Condition()
+
+    def notify(self) -> None:
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait(self, seen: int, timeout: float = LIVE_RELOAD_TIMEOUT) -> int:
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != seen, timeout)
+            return self.version
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, live_reload: LiveReload, **kwargs) -> None:
+        self.live_reload = live_reload
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == LIVE_RELOAD_PATH:
+            self.send_live_reload(urllib.parse.parse_qs(url.query).get("v", [""])[0])
+            return
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and url.path.endswith("/"):
+            path = os.path.join(path, "index.html")
+        if path.endswith(".html") and os.path.isfile(path):
+            self.send_html(path)
+            return
+        super().do_GET()
+
+    def send_live_reload(self, seen: str) -> None:
+        version = self.live_reload.version
+        if seen.isdigit():
+            version = self.live_reload.wait(int(seen))
+        self.send_bytes(str(version).encode(), "text/plain")
+
+    def send_html(self, path: str) -> None:
+        with open(path, "r") as f:
+            html = f.read()
+        if "</body>" in html:
+            html = html.replace("</body>", f"{LIVE_RELOAD_SCRIPT}</body>", 1)
+        else:
+            html += LIVE_RELOAD_SCRIPT
+        self.send_bytes(html.encode(), "text/html; charset=utf-8")
+
+    def send_bytes(self, body: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if not self.path.startswith(LIVE_RELOAD_PATH):
+            super().log_message(format, *args)
+
+
+def start_server(
+    directory: str, port: int, live_reload: LiveReload
+) -> ThreadingHTTPServer:
+    handler = partial(DevRequestHandler, directory=directory, live_reload=live_reload)
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving {directory} on http://localhost:{port}")
+    return server
+
+
+class DevSession:
+    def __init__(
+        self,
+        dir_path_content: str,
+        static_dir: str,
+        template_path: str,
+        dest_dir_path: str,
+        manifest: Manifest = None,
+        workers: int = 1,
+        link: str = "copy",
+        cache: BlockCache = None,
+        stream_threshold: int = STREAM_THRESHOLD,
+        mmap_threshold: int = MMAP_THRESHOLD,
+        atomic_writes: bool = False,
+        graph: DependencyGraph = None,
+        metadata: MetadataIndex = None,
+        build_aggregates: Callable[[], list[str]] = None,
+    ) -> None:
+        self.dir_path_content = dir_path_content
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir_path = dest_dir_path
+        self.manifest = manifest
+        self.workers = workers
+        self.link = link
+        self.cache = cache
+        self.stream_threshold = stream_threshold
+        self.mmap_threshold = mmap_threshold
+        self.atomic_writes = atomic_writes
+        self.graph = graph
+        self.metadata = metadata
+        # Rewrites the archive, tag and feed pages from the metadata index.
+        self.build_aggregates = build_aggregates
+        self.live_reload = LiveReload()
+        self.template_hash = hash_file(template_path)
+
+    def page_templates(self) -> dict[str, str]:
+        if self.metadata is None:
+            return {}
+        return self.metadata.templates(self.template_path)
+
+    def watched_paths(self) -> list[str]:
+        paths = [self.dir_path_content, self.static_dir, self.template_path]
+        for template_path in sorted(set(self.page_templates().values())):
+            if os.path.isfile(template_path):
+                paths.append(template_path)
+        return paths
+
+    def _relative_to(self, root: str, path: str) -> str | None:
+        rel_path = os.path.relpath(path, os.path.normpath(root))
+        if rel_path == os.curdir or rel_path.startswith(os.pardir):
+            return None
+        return rel_path
+
+    def rebuild(self, changed: set[str]) -> bool:
+        pages = []
+        assets = []
+        template_changed = False
+        page_templates = self.page_templates()
+        for path in sorted(changed):
+            page_path = self._relative_to(self.dir_path_content, path)
+            asset_path = self._relative_to(self.static_dir, path)
+            template_pages = [
+                from_path
+                for from_path, template_path in page_templates.items()
+                if os.path.normpath(template_path) == os.path.normpath(path)
+            ]
+            if os.path.normpath(path) == os.path.normpath(self.template_path):
+                template_changed = True
+            elif template_pages:
+                # A template named in front matter only affects its own pages.
+                pages.extend(template_pages)
+            elif page_path is not None:
+                pages.append(os.path.join(self.dir_path_content, page_path))
+            elif asset_path is not None:
+                assets.append(asset_path)
+
+        updated = self.sync_assets(assets)
+
+        reason = "source changed"
+        if template_changed:
+            self.template_hash = hash_file(self.template_path)
+            jobs = collect_pages(self.dir_path_content, self.dest_dir_path)
+            if self.metadata is not None:
+                jobs, failures = index_pages(
+                    self.metadata, jobs, self.dest_dir_path, self.mmap_threshold, set()
+                )
+                self.report_failures(failures)
+            reason = "template changed"
+        else:
+            jobs = []
+            for from_path in dict.fromkeys(pages):
+                dest_path = page_dest_path(
+                    from_path, self.dir_path_content, self.dest_dir_path
+                )
+                if os.path.isfile(from_path):
+                    jobs.append((from_path, dest_path))
+                elif self.remove_page(from_path, dest_path):
+                    updated = True
+            if self.metadata is not None:
+                published, failures = index_pages(
+                    self.metadata, jobs, self.dest_dir_path, self.mmap_threshold
+                )
+                self.report_failures(failures)
+                failed = {from_path for from_path, _ in failures}
+                drafts = [
+                    job
+                    for job in jobs
+                    if job not in published and job[0] not in failed
+                ]
+                for from_path, dest_path in drafts:
+                    print(f"Skipping draft {from_path}")
+                    if self.remove_page(from_path, dest_path):
+                        updated = True
+                jobs = published
+
+        rendered = self.render(jobs, reason)
+        if self.build_aggregates is not None and (pages or template_changed):
+            self.build_aggregates()
+            updated = True
+        return rendered or updated
+
+    def render(
+        self, jobs: list[tuple[str, str]], reason: str = "source changed"
+    ) -> bool:
+        templates = self.page_templates()
+        if self.graph is not None:
+            record_pages(
+                self.graph,
+                jobs,
+                self.dest_dir_path,
+                self.template_path,
+                dict.fromkeys((from_path for from_path, _ in jobs), reason),
+                self.mmap_threshold,
+                templates,
+            )
+
+        rendered = False
+        results = iter_render_results(
+            jobs,
+            self.template_path,
+            self.workers,
+            cache=self.cache,
+            stream_threshold=self.stream_threshold,
+            mmap_threshold=self.mmap_threshold,
+            atomic_writes=self.atomic_writes,
+            templates=templates,
+        )
+        for from_path, dest_path, error in results:
+            if error is not None:
+                self.report_failures([(from_path, error)])
+                continue
+            rendered = True
+            if self.manifest is not None:
+                template_hash = self.template_hash
+                if from_path in templates:
+                    template_hash = hash_file(templates[from_path])
+                self.manifest.record(
+                    from_path, hash_file(from_path), template_hash, dest_path
+                )
+        return rendered
+
+    def report_failures(self, failures: list[tuple[str, Exception]]) -> None:
+        for from_path, error in failures:
+            print(f"Failed to generate {from_path}: {error}")
+
+    def remove_page(self, from_path: str, dest_path: str) -> bool:
+        if self.manifest is not None:
+            self.manifest.pages.pop(from_path, None)
+        if self.graph is not None:
+            self.graph.pages.pop(from_path, None)
+        if self.metadata is not None:
+            self.metadata.pages.pop(from_path, None)
+        if not os.path.isfile(dest_path):
+            return False
+        print(f"Removing page {dest_path}")
+        os.remove(dest_path)
+        return True
+
+    def sync_assets(self, rel_paths: list[str]) -> bool:
+        updated = False
+        for rel_path in rel_paths:
+            src_path = os.path.join(self.static_dir, rel_path)
+            dest_path = os.path.join(self.dest_dir_path, rel_path)
+            if os.path.isfile(src_path):
+                print(f"Updating static file {dest_path}")
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                place_file(src_path, dest_path, self.link)
+                if self.manifest is not None:
+                    self.manifest.assets.add(rel_path)
+                updated = True
+            elif os.path.isfile(dest_path):
+                print(f"Removing static file {dest_path}")
+                os.remove(dest_path)
+                if self.manifest is not None:
+                    self.manifest.assets.discard(rel_path)
+                updated = True
+        return updated
+
+    def run(self, watcher) -> None:
+        print("Watching for changes... (press Ctrl+C to stop)")
+        while True:
+            changed = watcher.wait()
+            if not changed:
+                continue
+            if self.rebuild(changed):
+                self.live_reload.notify()
+            # Pages may have started using templates that aren't watched yet.
+            watcher.watch(self.watched_paths())
@@ -0,0 +1,35 @@
+import html
+from functools import lru_cache
+
+
+def escape_text(text: str) -> str:
+    # Most text has nothing to escape; three substring checks run in C and are
+    # much cheaper than building a new string.
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return html.escape(text, quote=False)
+
+
+def escape_attribute(value: str) -> str:
+    if (
+        "&" not in value
+        and "<" not in value
+        and ">" not in value
+        and '"' not in value
+        and "'" not in value
+    ):
+        return value
+    return html.escape(value, quote=True)
+
+
+@lru_cache(maxsize=4096)
+def render_attributes(items: tuple[tuple[str, str], ...]) -> str:
+    return "".join(f' {key}="{escape_attribute(value)}"' for key, value in items)
+
+
+def props_to_attributes(props: dict[str, str]) -> str:
+    # Links and images repeat the same few prop dicts all over a site, so the
+    # rendered attribute string is cached by the dict's items.
+    if not props:
+        return ""
+    return render_attributes(tuple(props.items()))
@@ -1,41 +1,505 @@
 import os
 import pathlib
-from markdown_parser import extract_title, markdown_to_html_node
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator
+from block_cache import BlockCache
+from depgraph import DependencyGraph, record_pages
+from escape import escape_text
+from manifest import Manifest, hash_file
+from markdown_parser import extract_page_header, parse_page, stream_markdown_html
+from metadata import MetadataIndex, index_pages
+from output_io import create_output_dirs, open_output, write_output
+from profiler import NULL_PROFILER, BuildProfiler
+from render_cache import RenderCache
+from source_io import MMAP_THRESHOLD, iter_source_lines, read_source
+from template import SlotValue, Template, load_template
 
+# Sources at least this large are streamed block by block instead of being
+# parsed into a full tree in memory.
+STREAM_THRESHOLD = 64 * 1024 * 1024
 
-def generate_page(from_path: str, template_path: str, dest_path: str) -> None:
+
+class BuildError(Exception):
+    def __init__(self, failures: list[tuple[str, Exception]]) -> None:
+        self.failures = failures
+        lines = [f"{len(failures)} page(s) failed to build:"]
+        lines += [f"  {path}: {error}" for path, error in failures]
+        super().__init__("\n".join(lines))
+
+
+def log_page(from_path: str, template_path: str, dest_path: str) -> None:
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
 
-    with open(from_path, "r") as f:
-        markdown = f.read()
 
-    with open(template_path, "r") as f:
-        template = f.read()
+def generate_page(from_path: str, template_path: str, dest_path: str) -> None:
+    log_page(from_path, template_path, dest_path)
+    render_page(from_path, load_template(template_path), dest_path)
 
-    node = markdown_to_html_node(markdown)
-    html = node.to_html()
-    title = extract_title(markdown)
 
-    template = template.replace(" {{ Title }} ", title, 1)
-    template = template.replace("{{ Content }}", html, 1)
+def page_values(
+    front_matter: dict[str, str], title: str | None, content: SlotValue
+) -> dict[str, SlotValue]:
+    # Front matter keys are template variables too; Title and Content win.
+    if title is None:
+        raise ValueError("No title given!")
+    values = {key: escape_text(value) for key, value in front_matter.items()}
+    values["Title"] = escape_text(title)
+    values["Content"] = content
+    return values
 
-    dest_dir_path = os.path.dirname(dest_path)
-    if dest_dir_path != "":
-        os.makedirs(dest_dir_path, exist_ok=True)
 
-    with open(dest_path, "w") as index_file:
-        index_file.write(template)
+def render_page(
+    from_path: str,
+    template: Template,
+    dest_path: str,
+    profiler: BuildProfiler = NULL_PROFILER,
+    cache: BlockCache = None,
+    render_cache: RenderCache = None,
+    stream_threshold: int = STREAM_THRESHOLD,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    atomic_writes: bool = False,
+    create_dirs: bool = True,
+) -> None:
+    if os.path.getsize(from_path) >= stream_threshold:
+        stream_page(
+            from_path,
+            template,
+            dest_path,
+            profiler,
+            mmap_threshold,
+            atomic_writes,
+            create_dirs,
+        )
+        return
 
+    with profiler.page(from_path):
+        with profiler.stage("read"):
+            markdown = read_source(from_path, mmap_threshold)
 
-def generate_pages_recursive(
-    dir_path_content: str, template_path: str, dest_dir_path: str
+        key = None
+        if render_cache is not None:
+            key = render_cache.key(markdown, template.digest)
+            html = render_cache.get(key)
+            if html is not None:
+                with profiler.stage("write"):
+                    write_output(dest_path, html, atomic_writes, create_dirs)
+                return
+
+        # The page is written as it is serialized; on a cache miss the fragments
+        # are kept too and stored once the page is complete.
+        fragments = render_fragments(markdown, template, profiler, cache)
+        written = []
+        if render_cache is not None:
+            fragments = _record_fragments(fragments, written)
+        with profiler.stage("write"):
+            with open_output(dest_path, atomic_writes, create_dirs) as index_file:
+                index_file.writelines(fragments)
+        if render_cache is not None:
+            render_cache.put(key, "".join(written))
+
+
+def _record_fragments(fragments: Iterable[str], written: list[str]) -> Iterator[str]:
+    for fragment in fragments:
+        written.append(fragment)
+        yield fragment
+
+
+def stream_page(
+    from_path: str,
+    template: Template,
+    dest_path: str,
+    profiler: BuildProfiler = NULL_PROFILER,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    atomic_writes: bool = False,
+    create_dirs: bool = True,
+) -> None:
+    # Memory stays bounded by the largest block, so streamed pages bypass both
+    # caches: their blocks would only evict useful entries and their HTML is too
+    # big to keep. Parsing and writing are interleaved and timed as one stage.
+    with profiler.page(from_path):
+        with profiler.stage("read"):
+            with closing(iter_source_lines(from_path, mmap_threshold)) as lines:
+                front_matter, title = extract_page_header(lines)
+        with closing(iter_source_lines(from_path, mmap_threshold)) as lines:
+            values = page_values(front_matter, title, stream_markdown_html(lines))
+            with profiler.stage("write"):
+                with open_output(dest_path, atomic_writes, create_dirs) as index_file:
+                    template.write_to(index_file, values)
+
+
+def render_markdown(
+    markdown: str,
+    template: Template,
+    profiler: BuildProfiler = NULL_PROFILER,
+    cache: BlockCache = None,
+    render_cache: RenderCache = None,
+) -> str:
+    key = None
+    html = None
+    if render_cache is not None:
+        key = render_cache.key(markdown, template.digest)
+        html = render_cache.get(key)
+    if html is None:
+        html = "".join(render_fragments(markdown, template, profiler, cache))
+        if render_cache is not None:
+            render_cache.put(key, html)
+    return html
+
+
+def render_fragments(
+    markdown: str,
+    template: Template,
+    profiler: BuildProfiler = NULL_PROFILER,
+    cache: BlockCache = None,
+) -> Iterable[str]:
+    front_matter, title, content = parse_page(markdown, cache, profiler)
+    if not profiler.enabled:
+        return template.iter_render(page_values(front_matter, title, content))
+
+    # Serialization and the template fill are otherwise interleaved with the
+    # write, so a profiled page finishes each on its own to time it.
+    with profiler.stage("html_serialization"):
+        content = content.to_html()
+    with profiler.stage("template_fill"):
+        return [template.render(page_values(front_matter, title, content))]
+
+
+_worker_cache: BlockCache = None
+_worker_render_cache: RenderCache = None
+_worker_templates: dict[str, Template] = {}
+
+
+# Templates reach each worker once, here, and pages name theirs by path instead
+# of pickling a copy with every task.
+def _init_worker(
+    cache: BlockCache, render_cache: RenderCache, templates: dict[str, Template]
 ) -> None:
-    for filename in os.listdir(dir_path_content):
+    global _worker_cache, _worker_render_cache, _worker_templates
+    _worker_cache = cache
+    _worker_render_cache = render_cache
+    _worker_templates = templates
+
+
+def _take_worker_updates() -> tuple[dict, dict]:
+    cache_updates = render_updates = None
+    if _worker_cache is not None:
+        cache_updates = _worker_cache.take_updates()
+    if _worker_render_cache is not None:
+        render_updates = _worker_render_cache.take_updates()
+    return cache_updates, render_updates
+
+
+def _render_in_worker(markdown: str, template_path: str) -> tuple[str, dict, dict]:
+    html = render_markdown(
+        markdown,
+        _worker_templates[template_path],
+        cache=_worker_cache,
+        render_cache=_worker_render_cache,
+    )
+    return (html, *_take_worker_updates())
+
+
+def _render_page_in_worker(
+    from_path: str,
+    template_path: str,
+    dest_path: str,
+    profile: bool,
+    stream_threshold: int,
+    mmap_threshold: int,
+    atomic_writes: bool,
+) -> tuple[dict[str, dict[str, float]], dict, dict]:
+    profiler = BuildProfiler() if profile else NULL_PROFILER
+    render_page(
+        from_path,
+        _worker_templates[template_path],
+        dest_path,
+        profiler,
+        _worker_cache,
+        _worker_render_cache,
+        stream_threshold,
+        mmap_threshold,
+        atomic_writes,
+        create_dirs=False,
+    )
+    return (profiler.pages if profile else {}), *_take_worker_updates()
+
+
+def generate_pages_recursive(
+    dir_path_content: str,
+    template_path: str,
+    dest_dir_path: str,
+    workers: int = 1,
+    profiler: BuildProfiler = NULL_PROFILER,
+    cache: BlockCache = None,
+    render_cache: RenderCache = None,
+    stream_threshold: int = STREAM_THRESHOLD,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    atomic_writes: bool = False,
+    graph: DependencyGraph = None,
+    metadata: MetadataIndex = None,
+) -> list[str]:
+    pages = collect_pages(dir_path_content, dest_dir_path)
+    templates = None
+    failures = []
+    if metadata is not None:
+        metadata.remove_missing({from_path for from_path, _ in pages})
+        pages, failures = index_pages(metadata, pages, dest_dir_path, mmap_threshold)
+        templates = metadata.templates(template_path)
+    if graph is not None:
+        reasons = dict.fromkeys((from_path for from_path, _ in pages), "full build")
+        record_pages(
+            graph,
+            pages,
+            dest_dir_path,
+            template_path,
+            reasons,
+            mmap_threshold,
+            templates,
+        )
+    try:
+        render_pages(
+            pages,
+            template_path,
+            workers,
+            profiler,
+            cache,
+            render_cache,
+            stream_threshold,
+            mmap_threshold,
+            atomic_writes,
+            templates,
+        )
+    except BuildError as e:
+        failures += e.failures
+    if failures:
+        raise BuildError(failures)
+    return [dest_path for _, dest_path in pages]
+
+
+def page_dest_path(from_path: str, dir_path_content: str, dest_dir_path: str) -> str:
+    rel_path = os.path.relpath(from_path, dir_path_content)
+    return str(pathlib.Path(dest_dir_path, rel_path).with_suffix(".html"))
+
+
+def collect_pages(dir_path_content: str, dest_dir_path: str) -> list[tuple[str, str]]:
+    pages = []
+    for filename in sorted(os.listdir(dir_path_content)):
         file_path = os.path.join(dir_path_content, filename)
         dest_path = os.path.join(dest_dir_path, filename)
 
         if os.path.isfile(file_path):
-            dest_path = pathlib.Path(dest_path).with_suffix(".html")
-            generate_page(file_path, template_path, dest_path)
+            dest_path = str(pathlib.Path(dest_path).with_suffix(".html"))
+            pages.append((file_path, dest_path))
         else:
-            generate_pages_recursive(file_path, template_path, dest_path)
+            pages.extend(collect_pages(file_path, dest_path))
+    return pages
+
+
+def iter_render_results(
+    pages: list[tuple[str, str]],
+    template_path: str,
+    workers: int = 1,
+    profiler: BuildProfiler = NULL_PROFILER,
+    cache: BlockCache = None,
+    render_cache: RenderCache = None,
+    stream_threshold: int = STREAM_THRESHOLD,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    atomic_writes: bool = False,
+    templates: dict[str, str] = None,
+) -> Iterator[tuple[str, str, Exception]]:
+    if workers == 0:
+        workers = os.cpu_count() or 1
+
+    # templates maps pages that use their own template to its path.
+    templates = templates or {}
+    # Output directories are created once up front instead of once per page.
+    create_output_dirs(dest_path for _, dest_path in pages)
+
+    if workers == 1 or len(pages) < 2:
+        for from_path, dest_path in pages:
+            page_template_path = templates.get(from_path, template_path)
+            log_page(from_path, page_template_path, dest_path)
+            try:
+                render_page(
+                    from_path,
+                    load_template(page_template_path),
+                    dest_path,
+                    profiler,
+                    cache,
+                    render_cache,
+                    stream_threshold,
+                    mmap_threshold,
+                    atomic_writes,
+                    create_dirs=False,
+                )
+            except Exception as e:
+                yield from_path, dest_path, e
+            else:
+                yield from_path, dest_path, None
+        return
+
+    if render_cache is not None:
+        render_cache.create()
+    template_paths = {templates.get(from_path, template_path) for from_path, _ in pages}
+    loaded = {path: load_template(path) for path in sorted(template_paths)}
+    # Results are consumed in submission order so logs and error reports are
+    # the same no matter which worker finishes first.
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(pages)),
+        initializer=_init_worker,
+        initargs=(cache, render_cache, loaded),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _render_page_in_worker,
+                from_path,
+                templates.get(from_path, template_path),
+                dest_path,
+                profiler.enabled,
+                stream_threshold,
+                mmap_threshold,
+                atomic_writes,
+            )
+            for from_path, dest_path in pages
+        ]
+        for (from_path, dest_path), future in zip(pages, futures):
+            log_page(from_path, templates.get(from_path, template_path), dest_path)
+            error = future.exception()
+            if error is None:
+                timings, cache_updates, render_updates = future.result()
+                if profiler.enabled:
+                    profiler.merge(timings)
+                if cache is not None:
+                    cache.apply_updates(cache_updates)
+                if render_cache is not None:
+                    render_cache.apply_updates(render_updates)
+            yield from_path, dest_path, error
+
+
+def render_pages(
+    pages: list[tuple[str, str]],
+    template_path: str,
+    workers: int = 1,
+    profiler: BuildProfiler = NULL_PROFILER,
+    cache: BlockCache = None,
+    render_cache: RenderCache = None,
+    stream_threshold: int = STREAM_THRESHOLD,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    atomic_writes: bool = False,
+    templates: dict[str, str] = None,
+) -> None:
+    results = iter_render_results(
+        pages,
+        template_path,
+        workers,
+        profiler,
+        cache,
+        render_cache,
+        stream_threshold,
+        mmap_threshold,
+        atomic_writes,
+        templates,
+    )
+    failures = [
+        (from_path, error) for from_path, _, error in results if error is not None
+    ]
+    if failures:
+        raise BuildError(failures)
+
+
+def generate_pages_incremental(
+    dir_path_content: str,
+    template_path: str,
+    dest_dir_path: str,
+    manifest: Manifest,
+    workers: int = 1,
+    profiler: BuildProfiler = NULL_PROFILER,
+    cache: BlockCache = None,
+    render_cache: RenderCache = None,
+    stream_threshold: int = STREAM_THRESHOLD,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    atomic_writes: bool = False,
+    graph: DependencyGraph = None,
+    metadata: MetadataIndex = None,
+) -> list[str]:
+    pages = collect_pages(dir_path_content, dest_dir_path)
+    source_hashes = {from_path: hash_file(from_path) for from_path, _ in pages}
+
+    templates = {}
+    failures = []
+    # Pages that fail before rendering still exist, so their outputs are kept.
+    live_sources = set(source_hashes)
+    if metadata is not None:
+        # Unchanged pages keep their indexed metadata without being read again.
+        changed = {
+            from_path
+            for from_path, source_hash in source_hashes.items()
+            if manifest.pages.get(from_path, {}).get("source_hash") != source_hash
+        }
+        metadata.remove_missing(set(source_hashes))
+        pages, failures = index_pages(
+            metadata, pages, dest_dir_path, mmap_threshold, changed
+        )
+        templates = metadata.templates(template_path)
+        live_sources = {from_path for from_path, _ in pages}
+        live_sources.update(from_path for from_path, _ in failures)
+
+    template_hashes = {}
+    stale = []
+    reasons = {}
+    for from_path, dest_path in pages:
+        page_template_path = templates.get(from_path, template_path)
+        if page_template_path not in template_hashes:
+            template_hashes[page_template_path] = hash_file(page_template_path)
+        reason = manifest.stale_reason(
+            from_path,
+            source_hashes[from_path],
+            template_hashes[page_template_path],
+            dest_path,
+        )
+        if reason is not None:
+            stale.append((from_path, dest_path))
+            reasons[from_path] = reason
+
+    if graph is not None:
+        record_pages(
+            graph,
+            stale,
+            dest_dir_path,
+            template_path,
+            reasons,
+            mmap_threshold,
+            templates,
+        )
+        graph.remove_missing(live_sources)
+
+    generated = []
+    for from_path, dest_path, error in iter_render_results(
+        stale,
+        template_path,
+        workers,
+        profiler,
+        cache,
+        render_cache,
+        stream_threshold,
+        mmap_threshold,
+        atomic_writes,
+        templates,
+    ):
+        if error is not None:
+            failures.append((from_path, error))
+            continue
+        template_hash = template_hashes[templates.get(from_path, template_path)]
+        manifest.record(from_path, source_hashes[from_path], template_hash, dest_path)
+        generated.append(dest_path)
+
+    live_dests = {dest_path for _, dest_path in pages}
+    for dest_path in manifest.remove_missing(live_sources):
+        if dest_path not in live_dests and os.path.exists(dest_path):
+            print(f"Removing stale page {dest_path}")
+            os.remove(dest_path)
+
+    if failures:
+        raise BuildError(failures)
+    return generated
@@ -1,4 +1,16 @@
+from typing import IO, Iterator
+
+from escape import escape_text, props_to_attributes
+
+
+# Leaves never have children, so they point at this shared tuple instead of
+# allocating a fresh list each.
+NO_CHILDREN = ()
+
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "_props")
+
     def __init__(
         self,
         tag: str = None,
@@ -9,51 +21,89 @@ class HTMLNode:
         self.tag = tag
         self.value = value
         self.children = children or []
-        self.props = props or {}
+        self._props = props or None
+
+    # Most nodes have no attributes; their props dict is only allocated when
+    # something reads it, and rendering never does.
+    @property
+    def props(self) -> dict[str, str]:
+        if self._props is None:
+            self._props = {}
+        return self._props
+
+    @props.setter
+    def props(self, props: dict[str, str]) -> None:
+        self._props = props
 
     def to_html(self):
         raise NotImplementedError("to_html() method not implemented")
 
+    def iter_html(self) -> Iterator[str]:
+        yield self.to_html()
+
+    def write_to(self, stream: IO[str]) -> None:
+        stream.writelines(self.iter_html())
+
     def props_to_html(self) -> str:
-        attributes = ""
-        if self.props:
-            for key, value in self.props.items():
-                attributes += f' {key}="{value}"'
-        return attributes
+        return props_to_attributes(self._props)
 
     def __repr__(self) -> str:
         return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, {self.props})"
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, value: str, props: dict[str, str] = None) -> None:
-        super().__init__(tag, value, None, props)
+        self.tag = tag
+        self.value = value
+        self.children = NO_CHILDREN
+        self._props = props or None
 
     def to_html(self):
         if not self.value:
             raise ValueError("LeafNode must have a value.")
+        value = escape_text(self.value)
         if not self.tag:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            return value
+        return f"<{self.tag}{self.props_to_html()}>{value}</{self.tag}>"
 
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(
         self, tag: str, children: list[HTMLNode], props: dict[str, str] = None
     ) -> None:
-        super().__init__(tag, None, children, props)
+        self.tag = tag
+        self.value = None
+        self.children = children
+        self._props = props or None
 
     def to_html(self):
-        if not self.tag:
-            raise ValueError("ParentNode needs a tag.")
-        if not self.children:
-            raise ValueError("ParentNode needs at least one children node.")
+        return "".join(self.iter_html())
 
-        children_html = "".join([child.to_html() for child in self.children])
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+    def iter_html(self) -> Iterator[str]:
+        # Walk the tree with an explicit stack so every tag and leaf is emitted
+        # exactly once, instead of re-joining each subtree at every depth.
+        stack: list[HTMLNode | str] = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+            elif isinstance(node, ParentNode):
+                if not node.tag:
+                    raise ValueError("ParentNode needs a tag.")
+                if not node.children:
+                    raise ValueError("ParentNode needs at least one children node.")
+                yield f"<{node.tag}{node.props_to_html()}>"
+                stack.append(f"</{node.tag}>")
+                stack.extend(reversed(node.children))
+            else:
+                yield from node.iter_html()
 
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
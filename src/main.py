@@ -1,26 +1,319 @@
+import argparse
 import os
-import shutil
+import sys
 
-from generate_page import generate_pages_recursive
-from copytree import copytree
+from aggregate import ARCHIVE_SIZE
+from async_build import IO_WORKERS
+from block_cache import BlockCache
+from build_session import BuildSession
+from copytree import LINK_MODES
+from dev_server import start_server
+from generate_page import STREAM_THRESHOLD, BuildError
+from profiler import NULL_PROFILER, BuildProfiler
+from render_cache import RenderCache
+from source_io import MMAP_THRESHOLD
+from validate import ValidationError
+from watch import create_watcher
 
 
-def main():
-    src_dir = "./static"
-    dest_dir = "./public"
-    template_path = "./template.html"
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=("build", "watch", "serve"),
+        default="build",
+        help="build once (default), rebuild on changes, or rebuild and serve "
+        "./public with live reload",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8888,
+        help="port used by the serve command (default 8888)",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="watch for changes by polling instead of inotify",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="keep ./public and only re-render pages whose source or template changed",
+    )
+    parser.add_argument(
+        "--manifest",
+        default="./.cache/manifest.json",
+        help="path of the build manifest used by --incremental",
+    )
+    parser.add_argument(
+        "--depgraph",
+        default="./.cache/depgraph.json",
+        metavar="PATH",
+        help="where the dependency graph between pages, the template and assets "
+        "is recorded",
+    )
+    parser.add_argument(
+        "--metadata",
+        default="./.cache/metadata.json",
+        metavar="PATH",
+        help="where the front matter and titles of all pages are indexed",
+    )
+    parser.add_argument(
+        "--explain",
+        metavar="PAGE",
+        help="print the dependencies of PAGE (a source or output path), why it was "
+        "last rebuilt and whether the next incremental build would rebuild it, "
+        "then exit",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="check every internal link and image against the generated pages and "
+        "static files, and fail the build if any are broken",
+    )
+    parser.add_argument(
+        "--aggregate",
+        action="store_true",
+        help="also generate a paginated archive and tag pages from the page "
+        "metadata, plus sitemap.xml and atom.xml when --base-url is given",
+    )
+    parser.add_argument(
+        "--base-url",
+        metavar="URL",
+        help="with --aggregate, the absolute URL the site is served from",
+    )
+    parser.add_argument(
+        "--archive-size",
+        type=int,
+        default=ARCHIVE_SIZE,
+        metavar="N",
+        help="with --aggregate, pages listed per archive page "
+        f"(default {ARCHIVE_SIZE})",
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="with --incremental, compare static files by content hash, not mtime",
+    )
+    parser.add_argument(
+        "--link",
+        choices=LINK_MODES,
+        default="copy",
+        help="with --incremental, how changed static files are placed in ./public",
+    )
+    parser.add_argument(
+        "--copy-workers",
+        type=int,
+        metavar="N",
+        help="number of threads copying static files (default: Python's default)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes used to render pages (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--async",
+        dest="pipeline",
+        action="store_true",
+        help="read, render and write pages in overlapping pipeline stages so disk "
+        "latency overlaps with parsing (full builds only; cannot be combined with "
+        "--incremental or --profile)",
+    )
+    parser.add_argument(
+        "--io-workers",
+        type=int,
+        default=IO_WORKERS,
+        metavar="N",
+        help=f"with --async, concurrent page reads and writes (default {IO_WORKERS})",
+    )
+    parser.add_argument(
+        "--atomic-writes",
+        action="store_true",
+        help="write each page to a temporary file and rename it into place, so "
+        "readers never see a partially written page",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default="./.cache",
+        help="directory holding the rendered page cache (default ./.cache)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=512,
+        metavar="MB",
+        help="size limit of the rendered page cache; least recently used pages "
+        "are evicted beyond it (default 512)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="render every page without reading or writing the page cache",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="empty the rendered page cache before building",
+    )
+    parser.add_argument(
+        "--block-cache-size",
+        type=int,
+        default=4096,
+        metavar="N",
+        help="parsed blocks kept in the in-memory block cache (0 disables it)",
+    )
+    parser.add_argument(
+        "--block-cache",
+        metavar="PATH",
+        help="load the block cache from PATH and save it back after the build",
+    )
+    parser.add_argument(
+        "--stream-threshold",
+        type=float,
+        default=STREAM_THRESHOLD / (1024 * 1024),
+        metavar="MB",
+        help="stream sources at least this large straight to their output instead "
+        "of parsing them in memory; they skip both caches (default 64)",
+    )
+    parser.add_argument(
+        "--mmap-threshold",
+        type=float,
+        default=MMAP_THRESHOLD / (1024 * 1024),
+        metavar="MB",
+        help="memory-map sources at least this large instead of reading them "
+        "through a buffered file (default 1)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time every build stage per page and print a summary report",
+    )
+    parser.add_argument(
+        "--profile-json",
+        metavar="PATH",
+        help="also write the profile summary as JSON to PATH (implies --profile)",
+    )
+    parser.add_argument(
+        "--profile-slowest",
+        type=int,
+        default=10,
+        metavar="N",
+        help="number of slowest pages listed in the profile report",
+    )
+    args = parser.parse_args(argv)
+    if args.pipeline and args.incremental:
+        parser.error("--async cannot be combined with --incremental")
+    if args.pipeline and (args.profile or args.profile_json):
+        parser.error("--async cannot be combined with --profile")
+    if args.base_url and not args.aggregate:
+        parser.error("--base-url requires --aggregate")
+    if args.jobs < 0:
+        parser.error("-j must be at least 1, or 0 for one worker per CPU")
+    if args.archive_size < 1:
+        parser.error("--archive-size must be at least 1")
+    return args
 
-    print("Deleting public directory...")
-    if os.path.exists(dest_dir):
-        shutil.rmtree(dest_dir)
 
-    print("Copying static files to public directory...")
-    copytree(src_dir, dest_dir)
+def main(argv: list[str] = None):
+    args = parse_args(argv)
+    profile = args.profile or args.profile_json
+    profiler = BuildProfiler() if profile else NULL_PROFILER
+    cache = None
+    if args.block_cache_size > 0:
+        if args.block_cache:
+            cache = BlockCache.load(args.block_cache, args.block_cache_size)
+        else:
+            cache = BlockCache(args.block_cache_size)
+    render_cache = None
+    if not args.no_cache:
+        render_cache = RenderCache(
+            os.path.join(args.cache_dir, "pages.sqlite"), args.cache_size * 1024 * 1024
+        )
+        if args.clear_cache:
+            print("Clearing page cache...")
+            render_cache.clear()
 
-    dir_path_content = "./content"
-    template_path = "./template.html"
-    generate_pages_recursive(dir_path_content, template_path, dest_dir)
+    session = BuildSession(
+        incremental=args.incremental,
+        manifest_path=args.manifest,
+        depgraph_path=args.depgraph,
+        metadata_path=args.metadata,
+        checksum=args.checksum,
+        link=args.link,
+        copy_workers=args.copy_workers,
+        workers=args.jobs,
+        pipeline=args.pipeline,
+        io_workers=args.io_workers,
+        stream_threshold=int(args.stream_threshold * 1024 * 1024),
+        mmap_threshold=int(args.mmap_threshold * 1024 * 1024),
+        atomic_writes=args.atomic_writes,
+        aggregate=args.aggregate,
+        base_url=args.base_url,
+        archive_size=args.archive_size,
+        profiler=profiler,
+        cache=cache,
+        render_cache=render_cache,
+    )
+
+    if args.explain:
+        print("\n".join(session.explain(args.explain)))
+        return
+
+    session.build()
+
+    if render_cache is not None:
+        print(f"Page cache: {render_cache.stats()}")
+        evicted = render_cache.evict()
+        if evicted:
+            print(f"Evicted {evicted} page(s) from the page cache.")
+    if cache is not None:
+        print(f"Block cache: {cache.stats()}")
+        if args.block_cache:
+            cache.save(args.block_cache)
+
+    if profile:
+        print(profiler.report_text(args.profile_slowest))
+    if args.profile_json:
+        profiler.write_json(args.profile_json, args.profile_slowest)
+
+    if args.validate:
+        print("Validating links and images...")
+        try:
+            session.validate()
+        except ValidationError as e:
+            if args.command == "build":
+                raise
+            print(e)
+        else:
+            print("No broken links or images.")
+
+    if args.command == "build":
+        return
+
+    dev_session = session.dev_session()
+    server = None
+    if args.command == "serve":
+        server = start_server(session.dest_dir, args.port, dev_session.live_reload)
+
+    watcher = create_watcher(dev_session.watched_paths(), args.poll)
+    try:
+        dev_session.run(watcher)
+    except KeyboardInterrupt:
+        print("Stopping...")
+    finally:
+        watcher.close()
+        if server is not None:
+            server.shutdown()
+        session.save()
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except (BuildError, ValidationError) as e:
+        sys.exit(str(e))
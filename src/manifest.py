@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+
+from output_io import open_output
+
+GENERATOR_VERSION = "3"
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    def __init__(self, path: str = None) -> None:
+        self.path = path
+        self.pages: dict[str, dict[str, str]] = {}
+        self.assets: set[str] = set()
+        self.aggregates: set[str] = set()
+
+    @classmethod
+    def load(cls, path: str) -> "Manifest":
+        manifest = cls(path)
+        if not os.path.exists(path):
+            return manifest
+
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        # Entries written by another generator version may render differently,
+        # so they are dropped and every page is rebuilt.
+        if data.get("generator") == GENERATOR_VERSION:
+            manifest.pages = data.get("pages", {})
+        manifest.assets = set(data.get("assets", []))
+        manifest.aggregates = set(data.get("aggregates", []))
+        return manifest
+
+    def save(self, path: str = None) -> None:
+        path = path or self.path
+        if not path:
+            raise ValueError("Manifest has no path to save to.")
+
+        data = {
+            "generator": GENERATOR_VERSION,
+            "pages": self.pages,
+            "assets": sorted(self.assets),
+            "aggregates": sorted(self.aggregates),
+        }
+        with open_output(path, atomic=True) as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+    def is_fresh(
+        self, source: str, source_hash: str, template_hash: str, dest: str
+    ) -> bool:
+        return self.stale_reason(source, source_hash, template_hash, dest) is None
+
+    def stale_reason(
+        self, source: str, source_hash: str, template_hash: str, dest: str
+    ) -> str | None:
+        entry = self.pages.get(source)
+        if entry is None:
+            return "not built before"
+        if entry["source_hash"] != source_hash:
+            return "source changed"
+        if entry["template_hash"] != template_hash:
+            return "template changed"
+        if entry["dest"] != dest:
+            return "output path changed"
+        if not os.path.exists(dest):
+            return "output missing"
+        return None
+
+    def record(
+        self, source: str, source_hash: str, template_hash: str, dest: str
+    ) -> None:
+        self.pages[source] = {
+            "source_hash": source_hash,
+            "template_hash": template_hash,
+            "dest": dest,
+        }
+
+    def remove_missing(self, sources: set[str]) -> list[str]:
+        removed = []
+        for source in sorted(set(self.pages) - sources):
+            removed.append(self.pages.pop(source)["dest"])
+        return removed
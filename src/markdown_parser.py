@@ -1,6 +1,15 @@
-from split_textnode import split_nodes_delimiter, split_nodes_image, split_nodes_link
+import re
+from itertools import chain
+from typing import Iterable, Iterator
+from split_textnode import split_inline
 from textnode import TextNode, TextType
 from htmlnode import HTMLNode, LeafNode, ParentNode
+from block_cache import BlockCache
+from profiler import NULL_PROFILER, BuildProfiler
+
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+FRONT_MATTER_FENCE = "---"
+FRONT_MATTER_FIELD = re.compile(r"([\w-]+)\s*:\s*(.*)")
 
 
 def text_node_to_html_node(text_node: TextNode) -> LeafNode:
@@ -22,43 +31,136 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
 
 
 def text_to_textnodes(text: str) -> list[TextNode]:
-    nodes = [TextNode(text, TextType.TEXT)]
-
-    split_functions = [
-        lambda n: split_nodes_delimiter(n, "**", TextType.BOLD),
-        lambda n: split_nodes_delimiter(n, "*", TextType.ITALIC),
-        lambda n: split_nodes_delimiter(n, "`", TextType.CODE),
-        split_nodes_image,
-        split_nodes_link,
-    ]
-
-    for function in split_functions:
-        nodes = function(nodes)
-
-    return nodes
+    return split_inline(text)
 
 
 def markdown_to_blocks(markdown: str) -> list[str]:
-    blocks = markdown.split("\n\n")
-    blocks = [block.strip() for block in blocks if block.strip()]
-    return blocks
+    return [block for block, _ in scan_blocks(markdown.splitlines())]
 
 
 def block_to_block_type(block: str) -> str:
-    if block.startswith(tuple("#" * i + " " for i in range(1, 7))):
+    return classify_block_lines(block.splitlines())
+
+
+def scan_blocks(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    return map(finish_block, scan_block_lines(lines))
+
+
+def scan_block_lines(lines: Iterable[str]) -> Iterator[list[str]]:
+    # The lines of each block, before finish_block joins and types them.
+    block = []
+    in_fence = False
+
+    for line in lines:
+        line = line.rstrip("\n")
+        if in_fence:
+            block.append(line)
+            if line.rstrip().endswith("```"):
+                in_fence = False
+            continue
+
+        if not line.strip():
+            if block:
+                yield block
+                block = []
+            continue
+
+        if not block:
+            line = line.lstrip()
+            # A fence opened at the start of a block runs to its closing fence,
+            # blank lines included.
+            fence = line.rstrip()
+            if fence.startswith("```") and not (
+                len(fence) >= 6 and fence.endswith("```")
+            ):
+                in_fence = True
+        block.append(line)
+
+    if block:
+        yield block
+
+
+def scan_numbered_blocks(lines: Iterable[str]) -> Iterator[tuple[int, str, str]]:
+    # scan_blocks over a page body, with the source line number each block
+    # starts on. A block is closed by a blank line or by the end of the page.
+    header = consumed = 0
+    last_blank = False
+
+    def counted_header(lines: Iterable[str]) -> Iterator[str]:
+        nonlocal header
+        for line in lines:
+            header += 1
+            yield line
+
+    def counted(lines: Iterable[str]) -> Iterator[str]:
+        nonlocal consumed, last_blank
+        for line in lines:
+            consumed += 1
+            last_blank = not line.strip()
+            yield line
+
+    source = counted_header(lines)
+    _, body = split_front_matter(source)
+    # After front matter the body reads on from the source; a header that isn't
+    # front matter is handed back to the body and numbered from the top.
+    if body is source:
+        consumed = header
+    body = counted(body)
+    for block, block_type in scan_blocks(body):
+        end = consumed - 1 if last_blank else consumed
+        yield end - block.count("\n"), block, block_type
+
+
+def inline_segments(block: str, block_type: str) -> Iterator[tuple[int, str]]:
+    # The text each block_to_html_node conversion hands to the inline parser,
+    # with the block line it starts on. Line breaks are kept so offsets map
+    # back to source lines: paragraphs are parsed with them joined by spaces.
+    # Code blocks have no inline markup.
+    match block_type:
+        case "heading":
+            yield 0, block[block.index(" ") + 1 :]
+        case "quote":
+            yield 0, "\n".join(line[1:].strip() for line in block.splitlines())
+        case "unordered_list":
+            for number, line in enumerate(block.splitlines()):
+                yield number, line.strip()[2:]
+        case "ordered_list":
+            for number, line in enumerate(block.splitlines()):
+                item = line.strip()
+                yield number, item[item.index(".") + 2 :]
+        case "paragraph":
+            yield 0, block
+
+
+def finish_block(lines: list[str]) -> tuple[str, str]:
+    lines[-1] = lines[-1].rstrip()
+    return "\n".join(lines), classify_block_lines(lines)
+
+
+def classify_block_lines(lines: list[str]) -> str:
+    if not lines:
+        return "paragraph"
+
+    first = lines[0]
+    if HEADING_PATTERN.match(first):
         return "heading"
-    elif block.startswith("```") and block.endswith("```"):
+    if first.startswith("```") and lines[-1].endswith("```"):
         return "code"
-    elif all(line.startswith(">") for line in block.splitlines()):
+
+    # Check the quote and both list predicates together in one pass over the lines.
+    quote = unordered = ordered = True
+    for number, line in enumerate(lines, start=1):
+        quote = quote and line.startswith(">")
+        unordered = unordered and line.startswith(("- ", "* "))
+        ordered = ordered and line.strip().startswith(f"{number}. ")
+        if not (quote or unordered or ordered):
+            return "paragraph"
+
+    if quote:
         return "quote"
-    elif all(line.startswith(("- ", "* ")) for line in block.splitlines()):
+    if unordered:
         return "unordered_list"
-    elif all(
-        line.strip().startswith(f"{i}. ")
-        for i, line in enumerate(block.splitlines(), start=1)
-    ):
-        return "ordered_list"
-    return "paragraph"
+    return "ordered_list"
 
 
 def text_to_children(text: str) -> list[HTMLNode]:
@@ -70,28 +172,122 @@ def text_to_children(text: str) -> list[HTMLNode]:
     return leaf_nodes
 
 
-def markdown_to_html_node(markdown: str) -> ParentNode:
-    blocks = markdown_to_blocks(markdown)
-    nodes = []
+def split_front_matter(
+    lines: Iterable[str],
+) -> tuple[dict[str, str], Iterator[str]]:
+    # Front matter is a run of "key: value" lines fenced by "---" at the very top
+    # of a page. Without a closing fence, or with any other line between the
+    # fences (a thematic break followed by text), the lines are left to the body.
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, lines
+    if first.rstrip() != FRONT_MATTER_FENCE:
+        return {}, chain([first], lines)
+
+    head = [first]
+    for line in lines:
+        head.append(line)
+        if line.rstrip() == FRONT_MATTER_FENCE:
+            fields = parse_front_matter(head[1:-1])
+            if fields is None:
+                return {}, chain(head, lines)
+            return fields, lines
+    return {}, iter(head)
+
+
+def parse_front_matter(lines: Iterable[str]) -> dict[str, str] | None:
+    # None unless every non-blank line is a "key: value" field.
+    fields = {}
+    for line in lines:
+        match = FRONT_MATTER_FIELD.fullmatch(line.strip())
+        if match is None:
+            if line.strip():
+                return None
+            continue
+        key, value = match.groups()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        fields[key] = value
+    return fields
+
+
+def block_title(block: str) -> str | None:
+    # Like extract_title, the first line of the block that starts with "# ",
+    # even when it isn't the line the block starts with.
+    if block.startswith("# "):
+        start = 0
+    else:
+        start = block.find("\n# ") + 1
+        if start == 0:
+            return None
+    return block[start:].split("\n", 1)[0].strip()[2:]
+
+
+def markdown_to_html_node(markdown: str, cache: BlockCache = None) -> ParentNode:
+    return parse_page(markdown, cache)[2]
 
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        match block_type:
-            case "heading":
-                node = heading_to_html_node(block)
-            case "code":
-                node = code_to_html_node(block)
-            case "quote":
-                node = quote_to_html_node(block)
-            case "unordered_list":
-                node = unordered_list_to_html_node(block)
-            case "ordered_list":
-                node = ordered_list_to_html_node(block)
-            case "paragraph":
-                node = paragraph_to_html_node(block)
-        nodes.append(node)
 
-    return ParentNode("div", nodes)
+def parse_page(
+    markdown: str, cache: BlockCache = None, profiler: BuildProfiler = NULL_PROFILER
+) -> tuple[dict[str, str], str | None, ParentNode]:
+    # Front matter, title and content come out of a single scan of the page.
+    # Each stage runs over the whole page before the next, so it can be timed.
+    with profiler.stage("block_split"):
+        front_matter, body = split_front_matter(markdown.splitlines())
+        block_lines = list(scan_block_lines(body))
+    with profiler.stage("block_typing"):
+        blocks = [finish_block(lines) for lines in block_lines]
+    with profiler.stage("inline_parse"):
+        title = front_matter.get("title") or None
+        nodes = []
+        for block, block_type in blocks:
+            if title is None:
+                title = block_title(block)
+            nodes.append(cached_block_to_html_node(block, block_type, cache))
+    return front_matter, title, ParentNode("div", nodes)
+
+
+def stream_markdown_html(
+    lines: Iterable[str], cache: BlockCache = None
+) -> Iterator[str]:
+    # Renders the same markup as markdown_to_html_node(...).to_html(), but each
+    # block is serialized and released as soon as the scanner closes it.
+    _, body = split_front_matter(lines)
+    yield "<div>"
+    for block, block_type in scan_blocks(body):
+        yield from cached_block_to_html_node(block, block_type, cache).iter_html()
+    yield "</div>"
+
+
+def cached_block_to_html_node(
+    block: str, block_type: str, cache: BlockCache = None
+) -> ParentNode:
+    if cache is None:
+        return block_to_html_node(block, block_type)
+
+    node = cache.get(block_type, block)
+    if node is None:
+        node = block_to_html_node(block, block_type)
+        cache.put(block_type, block, node)
+    return node
+
+
+def block_to_html_node(block: str, block_type: str) -> ParentNode:
+    match block_type:
+        case "heading":
+            return heading_to_html_node(block)
+        case "code":
+            return code_to_html_node(block)
+        case "quote":
+            return quote_to_html_node(block)
+        case "unordered_list":
+            return unordered_list_to_html_node(block)
+        case "ordered_list":
+            return ordered_list_to_html_node(block)
+        case "paragraph":
+            return paragraph_to_html_node(block)
+    raise ValueError(f"Invalid block type: {block_type}")
 
 
 def heading_to_html_node(block: str) -> ParentNode:
@@ -135,8 +331,24 @@ def paragraph_to_html_node(block: str) -> ParentNode:
     return ParentNode("p", children=text_to_children(paragraph))
 
 
+def extract_page_header(lines: Iterable[str]) -> tuple[dict[str, str], str]:
+    # Only reads as far as the title, which is normally the first block.
+    front_matter, body = split_front_matter(lines)
+    title = front_matter.get("title")
+    if title:
+        return front_matter, title
+    for block, _ in scan_blocks(body):
+        title = block_title(block)
+        if title is not None:
+            return front_matter, title
+    raise ValueError("No title given!")
+
+
 def extract_title(markdown: str) -> str:
-    lines = markdown.splitlines()
+    return extract_title_from_lines(markdown.splitlines())
+
+
+def extract_title_from_lines(lines: Iterable[str]) -> str:
     for line in lines:
         if line.startswith("# "):
             return line.strip()[2:]
@@ -0,0 +1,154 @@
+import datetime
+import json
+import os
+from contextlib import closing
+from typing import NamedTuple
+
+from depgraph import site_path
+from manifest import GENERATOR_VERSION
+from markdown_parser import extract_page_header
+from output_io import open_output
+from source_io import MMAP_THRESHOLD, iter_source_lines
+
+TRUE_VALUES = ("true", "yes", "on", "1")
+
+
+class PageMetadata(NamedTuple):
+    source: str
+    output: str
+    title: str
+    date: str | None
+    tags: tuple[str, ...]
+    draft: bool
+    template: str | None
+    fields: dict[str, str]
+
+
+def parse_date(value: str) -> str:
+    try:
+        return datetime.date.fromisoformat(value[:10]).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid date in front matter: {value}") from None
+
+
+def parse_tags(value: str) -> tuple[str, ...]:
+    tags = (tag.strip().strip("\"'") for tag in value.strip("[]").split(","))
+    return tuple(tag for tag in tags if tag)
+
+
+def page_metadata(
+    source: str, output: str, front_matter: dict[str, str], title: str
+) -> PageMetadata:
+    date = front_matter.get("date")
+    return PageMetadata(
+        source,
+        output,
+        title,
+        parse_date(date) if date else None,
+        parse_tags(front_matter.get("tags", "")),
+        front_matter.get("draft", "").lower() in TRUE_VALUES,
+        front_matter.get("template") or None,
+        front_matter,
+    )
+
+
+def read_page_metadata(
+    source: str, output: str, mmap_threshold: int = MMAP_THRESHOLD
+) -> PageMetadata:
+    with closing(iter_source_lines(source, mmap_threshold)) as lines:
+        front_matter, title = extract_page_header(lines)
+    return page_metadata(source, output, front_matter, title)
+
+
+class MetadataIndex:
+    def __init__(self, path: str = None) -> None:
+        self.path = path
+        self.pages: dict[str, PageMetadata] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "MetadataIndex":
+        index = cls(path)
+        if not os.path.exists(path):
+            return index
+
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("generator") == GENERATOR_VERSION:
+            for source, entry in data.get("pages", {}).items():
+                entry["tags"] = tuple(entry["tags"])
+                index.pages[source] = PageMetadata(**entry)
+        return index
+
+    def save(self, path: str = None) -> None:
+        path = path or self.path
+        if not path:
+            raise ValueError("Metadata index has no path to save to.")
+
+        pages = {source: entry._asdict() for source, entry in self.pages.items()}
+        data = {"generator": GENERATOR_VERSION, "pages": pages}
+        with open_output(path, atomic=True) as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+    def update(
+        self, source: str, output: str, mmap_threshold: int = MMAP_THRESHOLD
+    ) -> PageMetadata:
+        entry = read_page_metadata(source, output, mmap_threshold)
+        self.pages[source] = entry
+        return entry
+
+    def remove_missing(self, sources: set[str]) -> None:
+        for source in set(self.pages) - sources:
+            del self.pages[source]
+
+    def templates(self, template_path: str) -> dict[str, str]:
+        # Front matter templates are named relative to the default template.
+        template_dir = os.path.dirname(template_path)
+        return {
+            source: os.path.join(template_dir, entry.template)
+            for source, entry in self.pages.items()
+            if entry.template
+        }
+
+    def published(self) -> list[PageMetadata]:
+        # Newest first; undated pages follow in output order.
+        pages = sorted(
+            (entry for entry in self.pages.values() if not entry.draft),
+            key=lambda entry: entry.output,
+        )
+        return sorted(pages, key=lambda entry: entry.date or "", reverse=True)
+
+    def tags(self) -> dict[str, list[PageMetadata]]:
+        tagged: dict[str, list[PageMetadata]] = {}
+        for entry in self.published():
+            for tag in entry.tags:
+                tagged.setdefault(tag, []).append(entry)
+        return dict(sorted(tagged.items()))
+
+
+def index_pages(
+    index: MetadataIndex,
+    pages: list[tuple[str, str]],
+    dest_dir_path: str,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    changed: set[str] = None,
+) -> tuple[list[tuple[str, str]], list[tuple[str, Exception]]]:
+    # Reads the front matter and title of every page not already indexed (or
+    # listed in changed) and returns the pages that are not drafts, so drafts
+    # are dropped before any rendering work is queued. Pages whose header can't
+    # be read are dropped too and returned as failures, to be reported with the
+    # render failures.
+    published = []
+    failures = []
+    for from_path, dest_path in pages:
+        entry = index.pages.get(from_path)
+        if entry is None or changed is None or from_path in changed:
+            output = site_path(dest_path, dest_dir_path)
+            try:
+                entry = index.update(from_path, output, mmap_threshold)
+            except Exception as e:
+                index.pages.pop(from_path, None)
+                failures.append((from_path, e))
+                continue
+        if not entry.draft:
+            published.append((from_path, dest_path))
+    return published, failures
@@ -0,0 +1,67 @@
+import os
+from contextlib import contextmanager, suppress
+from typing import IO, Iterable, Iterator
+
+# Pages are written through a buffer this large, so most pages reach the disk in
+# a single write call.
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def output_dirs(dest_paths: Iterable[str]) -> list[str]:
+    dirs = {os.path.normpath(os.path.dirname(path) or os.curdir) for path in dest_paths}
+    dirs.discard(os.curdir)
+
+    # makedirs creates missing parents, so only the deepest directories need a
+    # call of their own.
+    parents = set()
+    for dir_path in dirs:
+        parent = os.path.dirname(dir_path)
+        while parent and parent not in parents:
+            parents.add(parent)
+            parent = os.path.dirname(parent)
+    return sorted(dirs - parents)
+
+
+def create_output_dirs(dest_paths: Iterable[str]) -> None:
+    for dir_path in output_dirs(dest_paths):
+        os.makedirs(dir_path, exist_ok=True)
+
+
+@contextmanager
+def open_output(
+    dest_path: str, atomic: bool = False, create_dirs: bool = True
+) -> Iterator[IO[str]]:
+    if create_dirs:
+        dest_dir_path = os.path.dirname(dest_path)
+        if dest_dir_path != "":
+            os.makedirs(dest_dir_path, exist_ok=True)
+
+    if not atomic:
+        # Pages are streamed, so one that fails partway is removed rather than
+        # left truncated.
+        try:
+            with open(dest_path, "w", buffering=WRITE_BUFFER_SIZE) as f:
+                yield f
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.remove(dest_path)
+            raise
+        return
+
+    # Readers of the output tree see either the old page or the complete new one.
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        with open(tmp_path, "w", buffering=WRITE_BUFFER_SIZE) as f:
+            yield f
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+def write_output(
+    dest_path: str, html: str, atomic: bool = False, create_dirs: bool = True
+) -> None:
+    with open_output(dest_path, atomic, create_dirs) as f:
+        f.write(html)
@@ -0,0 +1,112 @@
+import json
+import math
+import time
+from contextlib import contextmanager, nullcontext
+
+PAGE_STAGES = (
+    "read",
+    "block_split",
+    "block_typing",
+    "inline_parse",
+    "html_serialization",
+    "template_fill",
+    "write",
+)
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class BuildProfiler:
+    enabled = True
+
+    def __init__(self) -> None:
+        self.pages: dict[str, dict[str, float]] = {}
+        self.build_stages: dict[str, float] = {}
+        self._current = None
+
+    @contextmanager
+    def page(self, path: str):
+        timings = self.pages.setdefault(str(path), {})
+        previous, self._current = self._current, timings
+        try:
+            yield timings
+        finally:
+            self._current = previous
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            timings = self.build_stages if self._current is None else self._current
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+    def merge(self, pages: dict[str, dict[str, float]]) -> None:
+        self.pages.update(pages)
+
+    def summary(self, slowest: int = 10) -> dict:
+        stages = {}
+        for name in PAGE_STAGES:
+            values = sorted(t[name] for t in self.pages.values() if name in t)
+            stages[name] = {
+                "total": sum(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "max": values[-1] if values else 0.0,
+            }
+
+        totals = {path: sum(t.values()) for path, t in self.pages.items()}
+        ranked = sorted(totals, key=totals.get, reverse=True)[:slowest]
+        return {
+            "pages": len(self.pages),
+            "stages": stages,
+            "build_stages": dict(self.build_stages),
+            "slowest": [
+                {"path": path, "total": totals[path], "stages": self.pages[path]}
+                for path in ranked
+            ],
+        }
+
+    def report_text(self, slowest: int = 10) -> str:
+        summary = self.summary(slowest)
+        lines = [
+            f"Build profile ({summary['pages']} pages, times in ms)",
+            f"{'stage':<20} {'total':>10} {'p50':>8} {'p95':>8} {'max':>8}",
+        ]
+        for name, stats in summary["stages"].items():
+            lines.append(
+                f"{name:<20} {stats['total'] * 1000:>10.1f} {stats['p50'] * 1000:>8.2f}"
+                f" {stats['p95'] * 1000:>8.2f} {stats['max'] * 1000:>8.2f}"
+            )
+        for name, total in summary["build_stages"].items():
+            lines.append(f"{name:<20} {total * 1000:>10.1f}")
+
+        if summary["slowest"]:
+            lines.append(f"Slowest {len(summary['slowest'])} pages:")
+            for page in summary["slowest"]:
+                lines.append(f"{page['total'] * 1000:>10.2f}  {page['path']}")
+        return "\n".join(lines)
+
+    def write_json(self, path: str, slowest: int = 10) -> None:
+        with open(path, "w") as f:
+            json.dump(self.summary(slowest), f, indent=1)
+
+
+class NullProfiler:
+    enabled = False
+
+    def page(self, path: str):
+        return nullcontext()
+
+    def stage(self, name: str):
+        return nullcontext()
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,183 @@
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+from manifest import GENERATOR_VERSION
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    html TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+# Pages put in the cache are held in memory and written in one transaction once
+# this many bytes are pending, or when the cache is flushed.
+FLUSH_SIZE = 16 * 1024 * 1024
+
+
+class RenderCache:
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.created = False
+        self._connection = None
+        self._pid = None
+        self._pending: dict[str, tuple[str, float]] = {}
+        self._pending_size = 0
+        self._touched: dict[str, float] = {}
+
+    # Connections can't be shared with worker processes; each process opens its
+    # own the first time it touches the cache. Within a process the connection
+    # may be handed to a render thread, but it is never used concurrently.
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_pid"] = None
+        state["_pending"] = {}
+        state["_pending_size"] = 0
+        state["_touched"] = {}
+        return state
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            self.create()
+            self._connection = sqlite3.connect(
+                self.path, timeout=30, check_same_thread=False
+            )
+            self._pid = os.getpid()
+        return self._connection
+
+    # Creating the file and switching it to WAL don't wait for the busy timeout,
+    # so this runs in the parent before any worker opens the database.
+    def create(self) -> None:
+        if self.created:
+            return
+        dir_path = os.path.dirname(self.path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=30)) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(SCHEMA)
+        self.created = True
+
+    @staticmethod
+    def key(markdown: str, template_digest: str) -> str:
+        digest = hashlib.sha256(markdown.encode())
+        digest.update(template_digest.encode())
+        digest.update(GENERATOR_VERSION.encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> str | None:
+        if key in self._pending:
+            html = self._pending[key][0]
+        else:
+            row = self.connection.execute(
+                "SELECT html FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            html = row[0]
+        self._touched[key] = time.time()
+        self.hits += 1
+        return html
+
+    def put(self, key: str, html: str) -> None:
+        self._pending[key] = (html, time.time())
+        self._pending_size += len(html)
+        if self._pending_size >= FLUSH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending and not self._touched:
+            return
+        with self.connection as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                [
+                    (key, html, len(html), last_used)
+                    for key, (html, last_used) in self._pending.items()
+                ],
+            )
+            db.executemany(
+                "UPDATE pages SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()],
+            )
+        self._pending = {}
+        self._pending_size = 0
+        self._touched = {}
+
+    def total_size(self) -> int:
+        row = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM pages")
+        return row.fetchone()[0]
+
+    def evict(self) -> int:
+        self.flush()
+        excess = self.total_size() - self.max_bytes
+        if excess <= 0:
+            return 0
+
+        evicted = []
+        rows = self.connection.execute(
+            "SELECT key, size FROM pages ORDER BY last_used ASC"
+        ).fetchall()
+        for key, size in rows:
+            if excess <= 0:
+                break
+            evicted.append((key,))
+            excess -= size
+
+        with self.connection as db:
+            db.executemany("DELETE FROM pages WHERE key = ?", evicted)
+        return len(evicted)
+
+    def clear(self) -> None:
+        self._pending = {}
+        self._pending_size = 0
+        self._touched = {}
+        with self.connection as db:
+            db.execute("DELETE FROM pages")
+        self.connection.execute("VACUUM")
+
+    # Worker processes only read the database; the pages they render and the
+    # entries they use go back to the parent after every page, which writes
+    # them with its own.
+    def take_updates(self) -> dict:
+        updates = {
+            "pending": self._pending,
+            "touched": self._touched,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+        self._pending = {}
+        self._pending_size = 0
+        self._touched = {}
+        self.hits = self.misses = 0
+        return updates
+
+    def apply_updates(self, updates: dict) -> None:
+        self.hits += updates["hits"]
+        self.misses += updates["misses"]
+        self._touched.update(updates["touched"])
+        for key, (html, last_used) in updates["pending"].items():
+            self._pending[key] = (html, last_used)
+            self._pending_size += len(html)
+        if self._pending_size >= FLUSH_SIZE:
+            self.flush()
+
+    def stats(self) -> str:
+        return f"{self.hits} hit(s), {self.misses} miss(es)"
+
+    def close(self) -> None:
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
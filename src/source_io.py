@@ -0,0 +1,55 @@
+import locale
+import mmap
+import os
+from typing import Iterator
+
+# Sources at least this large are memory-mapped instead of read through a
+# buffered text file.
+MMAP_THRESHOLD = 1024 * 1024
+
+
+def source_encoding() -> str:
+    # The encoding open() picks in text mode, so mapped and regular reads agree.
+    return locale.getpreferredencoding(False)
+
+
+def translate_newlines(text: str) -> str:
+    if "\r" not in text:
+        return text
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def use_mmap(path: str, threshold: int = MMAP_THRESHOLD) -> bool:
+    size = os.path.getsize(path)
+    return size > 0 and size >= threshold
+
+
+def read_source(path: str, threshold: int = MMAP_THRESHOLD) -> str:
+    if not use_mmap(path, threshold):
+        with open(path, "r") as f:
+            return f.read()
+
+    # Decoding straight from the mapping skips the private bytes copy a buffered
+    # read makes, so the page cache is the only other copy of the file. The page
+    # is still decoded into one str, which the parser and the render cache key
+    # need whole; iter_source_lines decodes lazily, a line at a time.
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return translate_newlines(str(mapped, source_encoding()))
+
+
+def iter_source_lines(path: str, threshold: int = MMAP_THRESHOLD) -> Iterator[str]:
+    if not use_mmap(path, threshold):
+        with open(path, "r") as f:
+            yield from f
+        return
+
+    encoding = source_encoding()
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for line in iter(mapped.readline, b""):
+                text = str(line, encoding)
+                if "\r" in text:
+                    yield from translate_newlines(text).splitlines(keepends=True)
+                else:
+                    yield text
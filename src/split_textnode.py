@@ -1,6 +1,14 @@
 import re
+from typing import Iterator
+
 from textnode import TextNode, TextType
 
+IMAGE_PATTERN = re.compile(r"!\[(?P<label>[^\[\]]+)\]\((?P<url>.*?)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[(?P<label>[^\[\]]+)\]\((?P<url>.*?)\)")
+# Images and links in one pattern; the bang group tells them apart.
+REFERENCE_PATTERN = re.compile(r"(?P<bang>!?)\[(?P<label>[^\[\]]+)\]\((?P<url>.*?)\)")
+INLINE_MARKER_PATTERN = re.compile(r"[*`!\[]")
+
 
 def split_nodes_delimiter(
     old_nodes: list[TextNode], delimiter: str, text_type: TextType
@@ -32,9 +40,11 @@ def split_nodes_delimiter(
     return new_nodes
 
 
-def split_nodes_by_pattern(
-    old_nodes: list[TextNode], extract_func: callable, text_type: TextType
+def split_nodes_by_regex(
+    old_nodes: list[TextNode], pattern: re.Pattern, text_type: TextType
 ) -> list[TextNode]:
+    # The match spans say exactly where each reference sits, so the text between
+    # them is sliced out directly instead of being searched for again.
     new_nodes = []
 
     for node in old_nodes:
@@ -46,56 +56,97 @@ def split_nodes_by_pattern(
         if not text:
             continue
 
-        matches = extract_func(node.text)
-        if not matches:
+        start = 0
+        for match in pattern.finditer(text):
+            label, url = match.group("label", "url")
+            if start < match.start():
+                new_nodes.append(TextNode(text[start : match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(label, text_type, url))
+            start = match.end()
+
+        if start == 0:
             new_nodes.append(node)
-        else:
-            start = 0
-            for match in matches:
-                if text_type == TextType.LINK:
-                    link_syntax = f"[{match[0]}]({match[1]})"
-                elif text_type == TextType.IMAGE:
-                    link_syntax = f"![{match[0]}]({match[1]})"
-                else:
-                    raise ValueError("Unsupported text type passed.")
+        elif start < len(text):
+            new_nodes.append(TextNode(text[start:], TextType.TEXT))
 
-                match_start = text.find(link_syntax, start)
+    return new_nodes
 
-                if match_start == -1:
-                    continue
 
-                match_end = match_start + len(link_syntax)
+# The name the splitter had before it took a compiled pattern.
+split_nodes_by_pattern = split_nodes_by_regex
 
-                if start < match_start:
-                    before_text = text[start:match_start]
-                    new_nodes.append(TextNode(before_text, TextType.TEXT))
 
-                new_nodes.append(TextNode(match[0], text_type, match[1]))
+def extract_markdown_images(text: str) -> list[tuple]:
+    return IMAGE_PATTERN.findall(text)
 
-                start = match_end
 
-            if start < len(text):
-                after_text = text[start:]
-                new_nodes.append(TextNode(after_text, TextType.TEXT))
+def extract_markdown_links(text: str) -> list[tuple]:
+    return LINK_PATTERN.findall(text)
 
-    return new_nodes
 
+def reference_type(match: re.Match) -> TextType:
+    return TextType.IMAGE if match.group("bang") else TextType.LINK
 
-def extract_markdown_images(text: str) -> list[tuple]:
-    pattern = r"!\[([^\[\]]+)\]\((.*?)\)"
-    matches = re.findall(pattern, text)
-    return matches
 
+def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
+    return split_nodes_by_regex(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
 
-def extract_markdown_links(text: str) -> list[tuple]:
-    pattern = r"(?<!!)\[([^\[\]]+)\]\((.*?)\)"
-    matches = re.findall(pattern, text)
-    return matches
 
+def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
+    return split_nodes_by_regex(old_nodes, LINK_PATTERN, TextType.LINK)
+
+
+def split_inline(text: str) -> list[TextNode]:
+    return [node for _, node in scan_inline(text)]
+
+
+def scan_inline(text: str) -> Iterator[tuple[int, TextNode]]:
+    # Yields each node with the offset its source starts at in text.
+    plain_start = 0
+    i = 0
+
+    # Scan left to right, jumping between marker characters. Whatever span opens
+    # first wins, and its contents are taken literally, so a `*` inside inline
+    # code or a link label never starts emphasis.
+    while True:
+        marker = INLINE_MARKER_PATTERN.search(text, i)
+        if marker is None:
+            break
+        i = marker.start()
+        char = text[i]
+
+        if char == "`" or char == "*":
+            if char == "`":
+                delimiter, text_type = "`", TextType.CODE
+            elif text.startswith("**", i):
+                delimiter, text_type = "**", TextType.BOLD
+            else:
+                delimiter, text_type = "*", TextType.ITALIC
+
+            content_start = i + len(delimiter)
+            end = text.find(delimiter, content_start)
+            if end == -1:
+                raise Exception("Open delimiter detected!")
 
-def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
-    return split_nodes_by_pattern(old_nodes, extract_markdown_images, TextType.IMAGE)
+            if plain_start < i:
+                yield plain_start, TextNode(text[plain_start:i], TextType.TEXT)
+            if content_start < end:
+                yield i, TextNode(text[content_start:end], text_type)
+            i = plain_start = end + len(delimiter)
+            continue
+
+        # A "[" right after a "!" that failed to open an image cannot open a
+        # link either: the rest of the text is the same.
+        match = REFERENCE_PATTERN.match(text, i)
+        if match is None:
+            i += 1
+            continue
 
+        if plain_start < i:
+            yield plain_start, TextNode(text[plain_start:i], TextType.TEXT)
+        label, url = match.group("label", "url")
+        yield i, TextNode(label, reference_type(match), url)
+        i = plain_start = match.end()
 
-def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
-    return split_nodes_by_pattern(old_nodes, extract_markdown_links, TextType.LINK)
+    if plain_start < len(text):
+        yield plain_start, TextNode(text[plain_start:], TextType.TEXT)
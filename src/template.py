@@ -0,0 +1,74 @@
+import hashlib
+import os
+import re
+from typing import IO, Iterable, Iterator
+
+from htmlnode import HTMLNode
+
+SLOT_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+# Like the original string replace, a Title slot padded with one space on each
+# side (as in "<title> {{ Title }} </title>") takes the padding with it.
+PADDED_TITLE = " {{ Title }} "
+
+# Slots take plain strings, nodes, or any iterable of HTML fragments; iterables
+# are consumed lazily, and only once, while the page is written.
+SlotValue = str | HTMLNode | Iterable[str]
+
+
+class Template:
+    def __init__(self, source: str) -> None:
+        self.chunks: list[str] = []
+        self.slots: list[str] = []
+        self.digest = hashlib.sha256(source.encode()).hexdigest()
+
+        # chunks[i] is emitted before slots[i]; the last chunk closes the page.
+        start = 0
+        for match in SLOT_PATTERN.finditer(source):
+            slot_start, slot_end = match.span()
+            padded = source[slot_start - 1 : slot_end + 1] == PADDED_TITLE
+            if padded and slot_start > start:
+                slot_start, slot_end = slot_start - 1, slot_end + 1
+            self.chunks.append(source[start:slot_start])
+            self.slots.append(match.group(1))
+            start = slot_end
+        self.chunks.append(source[start:])
+
+    @classmethod
+    def from_file(cls, path: str) -> "Template":
+        with open(path, "r") as f:
+            return cls(f.read())
+
+    def render(self, values: dict[str, SlotValue]) -> str:
+        return "".join(self.iter_render(values))
+
+    def iter_render(self, values: dict[str, SlotValue]) -> Iterator[str]:
+        for chunk, slot in zip(self.chunks, self.slots):
+            yield chunk
+            value = values.get(slot, "")
+            if isinstance(value, str):
+                yield value
+            elif isinstance(value, HTMLNode):
+                yield from value.iter_html()
+            else:
+                yield from value
+        yield self.chunks[-1]
+
+    def write_to(self, stream: IO[str], values: dict[str, SlotValue]) -> None:
+        stream.writelines(self.iter_render(values))
+
+    def __repr__(self) -> str:
+        return f"Template(slots: {self.slots})"
+
+
+_loaded: dict[str, tuple[int, Template]] = {}
+
+
+def load_template(path: str) -> Template:
+    mtime = os.stat(path).st_mtime_ns
+    cached = _loaded.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    template = Template.from_file(path)
+    _loaded[path] = (mtime, template)
+    return template
@@ -11,12 +11,19 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
-        if text_type not in TextType:
-            raise Exception(f"Invalid type used for text node: {text_type}")
+        if text_type.__class__ is not TextType:
+            try:
+                text_type = TextType(text_type)
+            except ValueError:
+                raise Exception(
+                    f"Invalid type used for text node: {text_type}"
+                ) from None
 
         self.text = text
-        self.text_type = TextType(text_type)
+        self.text_type = text_type
         self.url = url
 
     def __eq__(self, other):
@@ -0,0 +1,63 @@
+import os
+from typing import Iterable, NamedTuple
+
+from depgraph import DependencyGraph
+
+
+class BrokenReference(NamedTuple):
+    source: str
+    line: int
+    kind: str
+    target: str
+
+    def __str__(self) -> str:
+        return f"{self.source}:{self.line}: broken {self.kind} {self.target}"
+
+
+class ValidationError(Exception):
+    def __init__(self, broken: list[BrokenReference]) -> None:
+        self.broken = broken
+        lines = [f"{len(broken)} broken reference(s):"]
+        lines += [f"  {reference}" for reference in broken]
+        super().__init__("\n".join(lines))
+
+
+def static_paths(static_dir: str) -> set[str]:
+    paths = set()
+    for dir_path, _, filenames in os.walk(static_dir):
+        rel_dir = os.path.relpath(dir_path, static_dir)
+        for filename in filenames:
+            rel_path = os.path.normpath(os.path.join(rel_dir, filename))
+            paths.add(rel_path.replace(os.sep, "/"))
+    return paths
+
+
+def build_output_index(
+    graph: DependencyGraph, static_dir: str, generated: Iterable[str] = ()
+) -> set[str]:
+    # Every file the site serves, as a site-relative path, gathered once so each
+    # reference is checked with a set lookup instead of a stat call.
+    index = static_paths(static_dir)
+    index.update(entry["output"] for entry in graph.pages.values())
+    index.update(generated)
+    return index
+
+
+def find_broken_references(
+    graph: DependencyGraph, index: set[str]
+) -> list[BrokenReference]:
+    broken = []
+    for source in sorted(graph.pages):
+        for line, kind, target, path in graph.pages[source].get("references", ()):
+            if path not in index:
+                broken.append(BrokenReference(source, line, kind, target))
+    return broken
+
+
+def validate_site(
+    graph: DependencyGraph, static_dir: str, generated: Iterable[str] = ()
+) -> None:
+    index = build_output_index(graph, static_dir, generated)
+    broken = find_broken_references(graph, index)
+    if broken:
+        raise ValidationError(broken)
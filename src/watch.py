@@ -0,0 +1,186 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = (
+    IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+# Editors save in bursts (write temp file, rename, chmod); events arriving
+# within this window are reported as one batch.
+DEBOUNCE_SECONDS = 0.05
+
+
+class InotifyWatcher:
+    def __init__(self, paths: list[str]) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._dirs: dict[int, str] = {}
+        self._trees: set[str] = set()
+        self._files: dict[str, set[str]] = {}
+        self.watch(paths)
+
+    # Adds paths to the watch; ones already watched are left as they are.
+    def watch(self, paths: list[str]) -> None:
+        for path in paths:
+            path = os.path.normpath(path)
+            if os.path.isdir(path):
+                self._watch_tree(path)
+            else:
+                # Files are watched through their directory so that editors that
+                # save by renaming a temp file over the original are still seen.
+                parent = os.path.dirname(path) or "."
+                self._files.setdefault(parent, set()).add(path)
+                self._watch_dir(parent)
+
+    def _watch_dir(self, path: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self._dirs[wd] = path
+
+    def _watch_tree(self, root: str) -> None:
+        for dir_path, _, _ in os.walk(root):
+            dir_path = os.path.normpath(dir_path)
+            self._trees.add(dir_path)
+            self._watch_dir(dir_path)
+
+    def _is_watched(self, dir_path: str, path: str) -> bool:
+        # Only directories watched just for some of their files are filtered;
+        # a file inside a watched tree doesn't narrow the tree's events.
+        return dir_path in self._trees or path in self._files.get(dir_path, ())
+
+    def _read_events(self) -> set[str]:
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + name_length].rstrip(b"\0"))
+            offset += name_length
+
+            dir_path = self._dirs.get(wd)
+            if dir_path is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._dirs[wd]
+                continue
+
+            path = os.path.join(dir_path, name) if name else dir_path
+            if not self._is_watched(dir_path, path):
+                continue
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_tree(path)
+                for sub_dir, _, filenames in os.walk(path):
+                    changed.update(os.path.join(sub_dir, f) for f in filenames)
+            changed.add(path)
+        return changed
+
+    def wait(self, timeout: float = None) -> set[str]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = self._read_events()
+        while select.select([self._fd], [], [], DEBOUNCE_SECONDS)[0]:
+            changed |= self._read_events()
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    def __init__(self, paths: list[str], interval: float = 0.5) -> None:
+        self.paths = [os.path.normpath(path) for path in paths]
+        self.interval = interval
+        self._snapshot = self._scan(self.paths)
+
+    def watch(self, paths: list[str]) -> None:
+        paths = [os.path.normpath(path) for path in paths]
+        added = [path for path in dict.fromkeys(paths) if path not in self.paths]
+        self.paths.extend(added)
+        self._snapshot.update(self._scan(added))
+
+    def _scan(self, paths: list[str]) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        for root in paths:
+            if os.path.isdir(root):
+                files = (
+                    os.path.join(dir_path, filename)
+                    for dir_path, _, filenames in os.walk(root)
+                    for filename in filenames
+                )
+            else:
+                files = [root]
+            for path in files:
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout: float = None) -> set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan(self.paths)
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval)
+
+    def close(self) -> None:
+        pass
+
+
+def create_watcher(paths: list[str], poll: bool = False):
+    if not poll:
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(paths)
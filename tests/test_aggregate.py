@@ -0,0 +1,171 @@
+import contextlib
+import io
+import os
+import unittest
+
+from src import (
+    BuildSession,
+    MetadataIndex,
+    atom_feed,
+    listing_pages,
+    page_metadata,
+    page_url,
+    paginate,
+    sitemap_xml,
+    tag_slug,
+    tag_slugs,
+)
+from tests.site_fixture import SiteFixture
+
+
+def make_index():
+    index = MetadataIndex()
+    for source, output, title, front_matter in (
+        ("index.md", "index.html", "Home", {}),
+        ("a.md", "blog/a/index.html", "A & B", {"date": "2024-01-03", "tags": "C++"}),
+        ("b.md", "blog/b.html", "B", {"date": "2024-01-02", "tags": "C++, misc"}),
+        ("c.md", "about/index.html", "About", {}),
+        ("d.md", "blog/d.html", "Draft", {"date": "2025-01-01", "draft": "true"}),
+    ):
+        index.pages[source] = page_metadata(source, output, front_matter, title)
+    return index
+
+
+class TestHelpers(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("index.html"), "/")
+        self.assertEqual(page_url("blog/a/index.html"), "/blog/a/")
+        self.assertEqual(page_url("blog/b.html"), "/blog/b.html")
+        self.assertEqual(page_url("tags/é/index.html"), "/tags/%C3%A9/")
+
+    def test_tag_slug(self):
+        self.assertEqual(tag_slug("C++ Tips"), "c-tips")
+        self.assertEqual(tag_slug("++"), "tag")
+        self.assertEqual(tag_slug("Ünïcode tag"), "ünïcode-tag")
+
+    def test_tag_slugs_are_unique(self):
+        self.assertEqual(
+            tag_slugs(["C++", "C", "C#", "++", "#"]),
+            {"#": "tag", "++": "tag-2", "C": "c", "C#": "c-2", "C++": "c-3"},
+        )
+
+    def test_paginate(self):
+        self.assertEqual(paginate([1, 2, 3], 2), [[1, 2], [3]])
+        self.assertEqual(paginate([], 2), [[]])
+
+
+class TestListingPages(unittest.TestCase):
+    def test_archive_pages_and_tags(self):
+        pages = {
+            output: (title, node)
+            for output, title, node in listing_pages(make_index(), archive_size=2)
+        }
+        self.assertEqual(
+            list(pages),
+            [
+                "archive/index.html",
+                "archive/2/index.html",
+                "tags/index.html",
+                "tags/c/index.html",
+                "tags/misc/index.html",
+            ],
+        )
+        title, node = pages["archive/index.html"]
+        self.assertEqual(title, "Archive")
+        self.assertEqual(
+            node.to_html(),
+            '<div><h1>Archive</h1><ul><li><a href="/blog/a/">A &amp; B</a> '
+            '<time datetime="2024-01-03">2024-01-03</time></li>'
+            '<li><a href="/blog/b.html">B</a> '
+            '<time datetime="2024-01-02">2024-01-02</time></li></ul>'
+            '<nav><a href="/archive/2/" rel="next">Older</a></nav></div>',
+        )
+        older = pages["archive/2/index.html"][1].to_html()
+        self.assertIn('<a href="/archive/" rel="prev">Newer</a>', older)
+        self.assertIn(">C++</a> (2)", pages["tags/index.html"][1].to_html())
+
+
+class TestFeeds(unittest.TestCase):
+    def test_atom_feed(self):
+        feed = atom_feed(make_index(), "https://example.com/", feed_size=1)
+        self.assertIn("<title>Home</title>", feed)
+        self.assertIn("<updated>2024-01-03T00:00:00Z</updated>", feed)
+        self.assertIn('<link href="https://example.com/blog/a/"/>', feed)
+        self.assertIn('<category term="C++"/>', feed)
+        self.assertEqual(feed.count("<entry>"), 1)
+        self.assertIsNone(atom_feed(MetadataIndex(), "https://example.com"))
+
+    def test_sitemap(self):
+        sitemap = sitemap_xml(make_index(), "https://example.com", ["tags/index.html"])
+        self.assertIn("<loc>https://example.com/</loc>", sitemap)
+        self.assertIn("<loc>https://example.com/tags/</loc>", sitemap)
+        self.assertIn("<lastmod>2024-01-02</lastmod>", sitemap)
+        self.assertNotIn("blog/d.html", sitemap)
+
+
+class TestAggregateBuild(SiteFixture, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[All](/archive)")
+        self.post = os.path.join(self.content, "post.md")
+        self.write(self.post, "---\ndate: 2024-05-01\ntags: news\n---\n# Post")
+
+    def session(self):
+        return BuildSession(
+            self.content,
+            self.static,
+            self.public,
+            self.template,
+            incremental=True,
+            manifest_path=os.path.join(self.root, "cache", "manifest.json"),
+            depgraph_path=os.path.join(self.root, "cache", "depgraph.json"),
+            metadata_path=os.path.join(self.root, "cache", "metadata.json"),
+            aggregate=True,
+            base_url="https://example.com",
+        )
+
+    def build(self):
+        session = self.session()
+        with contextlib.redirect_stdout(io.StringIO()):
+            session.build()
+        return session
+
+    def test_aggregates_follow_incremental_builds(self):
+        session = self.build()
+        self.assertEqual(
+            session.aggregates,
+            [
+                "archive/index.html",
+                "tags/index.html",
+                "tags/news/index.html",
+                "sitemap.xml",
+                "atom.xml",
+            ],
+        )
+        session.validate()
+
+        self.write(self.post, "---\ndate: 2024-05-01\n---\n# Post")
+        session = self.build()
+        self.assertNotIn("tags/news/index.html", session.aggregates)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.public, "tags", "news", "index.html"))
+        )
+        archive = self.read("archive", "index.html")
+        self.assertIn('<a href="/post.html">Post</a>', archive)
+
+    def test_dev_session_rewrites_aggregates(self):
+        session = self.build()
+        dev_session = session.dev_session()
+        self.write(self.post, "---\ndate: 2024-05-01\ntags: C, C#\n---\n# Post")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(dev_session.rebuild({self.post}))
+        for slug, tag in (("c", "C"), ("c-2", "C#")):
+            self.assertIn(f"Tagged {tag}", self.read("tags", slug, "index.html"))
+        self.assertFalse(
+            os.path.exists(os.path.join(self.public, "tags", "news", "index.html"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
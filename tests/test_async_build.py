@@ -0,0 +1,70 @@
+import os
+import unittest
+
+from src import BlockCache, BuildError, collect_pages, render_pages, render_pages_async
+from tests.site_fixture import SiteFixture
+
+
+class TestRenderPagesAsync(SiteFixture, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        for i in range(6):
+            self.write(
+                os.path.join(self.content, f"page{i}", "index.md"),
+                f"# Page {i}\n\nShared *footer*\n\n- item {i}\n",
+            )
+        self.pages = collect_pages(self.content, self.public)
+
+    def read_outputs(self):
+        outputs = []
+        for _, dest_path in self.pages:
+            outputs.append(self.read(os.path.relpath(dest_path, self.public)))
+            os.remove(dest_path)
+        return outputs
+
+    def test_matches_serial_build(self):
+        render_pages(self.pages, self.template)
+        expected = self.read_outputs()
+
+        render_pages_async(self.pages, self.template, io_workers=2, queue_size=1)
+        self.assertEqual(self.read_outputs(), expected)
+
+        render_pages_async(self.pages, self.template, workers=2)
+        self.assertEqual(self.read_outputs(), expected)
+
+        render_pages_async(self.pages, self.template, stream_threshold=0)
+        self.assertEqual(self.read_outputs(), expected)
+
+    def test_cache_updates_reach_parent(self):
+        for workers in (1, 2):
+            cache = BlockCache(persistent=True)
+            render_pages_async(self.pages, self.template, workers, cache=cache)
+            # Each worker process misses the shared block once before caching it.
+            self.assertEqual(cache.hits + cache.misses, 18)
+            self.assertGreaterEqual(cache.hits, 6 - workers)
+            self.assertEqual(len(cache), 13)
+
+    def test_unsaved_cache_gets_counts_only(self):
+        cache = BlockCache()
+        render_pages_async(self.pages, self.template, 2, cache=cache)
+        self.assertEqual(cache.hits + cache.misses, 18)
+        self.assertEqual(len(cache), 0)
+
+    def test_errors_are_aggregated(self):
+        for i in (4, 1):
+            self.write(self.pages[i][0], "no title")
+
+        with self.assertRaises(BuildError) as context:
+            render_pages_async(self.pages, self.template, io_workers=3)
+
+        self.assertEqual(
+            [path for path, _ in context.exception.failures],
+            [self.pages[1][0], self.pages[4][0]],
+        )
+        self.assertTrue(os.path.exists(self.pages[0][1]))
+        self.assertFalse(os.path.exists(self.pages[1][1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from src import BlockCache, LeafNode, ParentNode, markdown_to_html_node
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = BlockCache()
+        node = LeafNode(None, "text")
+        self.assertIsNone(cache.get("paragraph", "text"))
+        cache.put("paragraph", "text", node)
+        self.assertIs(cache.get("paragraph", "text"), node)
+        self.assertIsNone(cache.get("heading", "text"))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertAlmostEqual(cache.hit_rate, 1 / 3)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = BlockCache(maxsize=2)
+        cache.put("paragraph", "a", LeafNode(None, "a"))
+        cache.put("paragraph", "b", LeafNode(None, "b"))
+        cache.get("paragraph", "a")
+        cache.put("paragraph", "c", LeafNode(None, "c"))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("paragraph", "b"))
+        self.assertIsNotNone(cache.get("paragraph", "a"))
+        self.assertIsNotNone(cache.get("paragraph", "c"))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "cache", "blocks.pickle")
+            cache = BlockCache()
+            cache.put("paragraph", "a", ParentNode("p", [LeafNode("b", "a")]))
+            cache.save(path)
+
+            loaded = BlockCache.load(path)
+            self.assertEqual(loaded.get("paragraph", "a").to_html(), "<p><b>a</b></p>")
+
+    def test_load_missing_or_corrupt_file(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "blocks.pickle")
+            self.assertEqual(len(BlockCache.load(path)), 0)
+            with open(path, "wb") as f:
+                f.write(b"not a pickle")
+            self.assertEqual(len(BlockCache.load(path)), 0)
+
+    def test_take_and_apply_updates(self):
+        worker = BlockCache(persistent=True)
+        worker.get("paragraph", "a")
+        worker.put("paragraph", "a", LeafNode(None, "a"))
+        updates = worker.take_updates()
+        self.assertEqual(worker.take_updates()["entries"], {})
+
+        parent = BlockCache()
+        parent.apply_updates(updates)
+        self.assertEqual(parent.misses, 1)
+        self.assertEqual(len(parent), 1)
+
+    def test_unsaved_cache_sends_only_counts(self):
+        worker = BlockCache()
+        worker.get("paragraph", "a")
+        worker.put("paragraph", "a", LeafNode(None, "a"))
+        worker.get("paragraph", "a")
+        updates = worker.take_updates()
+        self.assertEqual(updates, {"entries": {}, "hits": 1, "misses": 1})
+
+
+class TestCachedMarkdownToHTMLNode(unittest.TestCase):
+    def test_repeated_blocks_are_shared(self):
+        markdown = "# Title\n\nShared **footer**\n\nShared **footer**"
+        cache = BlockCache()
+        node = markdown_to_html_node(markdown, cache)
+
+        self.assertEqual(node.to_html(), markdown_to_html_node(markdown).to_html())
+        self.assertIs(node.children[1], node.children[2])
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import contextlib
+import io
+import os
+import unittest
+
+from src import BlockCache, BuildError, BuildSession, RenderCache
+from tests.site_fixture import SiteFixture
+
+
+class TestBuildSession(SiteFixture, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[Blog](/blog)")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+
+    def session(self, **kwargs):
+        return BuildSession(
+            self.content,
+            self.static,
+            self.public,
+            self.template,
+            manifest_path=os.path.join(self.root, "cache", "manifest.json"),
+            depgraph_path=os.path.join(self.root, "cache", "depgraph.json"),
+            metadata_path=os.path.join(self.root, "cache", "metadata.json"),
+            **kwargs,
+        )
+
+    def build(self, session):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return session.build()
+
+    def test_render_string(self):
+        session = self.session(cache=BlockCache(16))
+        self.assertEqual(
+            session.render_string("# Hi\n\nSome *text*"),
+            "<title>Hi</title><div><h1>Hi</h1><p>Some <i>text</i></p></div>",
+        )
+        session.render_string("# Hi\n\nSome *text*")
+        self.assertEqual(session.cache.hits, 2)
+
+    def test_previews_leave_caches_and_index_alone(self):
+        render_cache = RenderCache(os.path.join(self.root, "cache", "pages.sqlite"))
+        session = self.session(render_cache=render_cache)
+        session.render_string("# Hi")
+        session.render_page("blog/index.md")
+        render_cache.flush()
+        key = RenderCache.key("# Hi", session.template.digest)
+        self.assertIsNone(render_cache.get(key))
+        self.assertEqual(session.metadata.pages, {})
+        session.close()
+
+    def test_render_page(self):
+        session = self.session()
+        self.assertEqual(
+            session.render_page("blog/index.md"),
+            "<title>Blog</title><div><h1>Blog</h1></div>",
+        )
+        self.assertFalse(os.path.exists(self.public))
+
+    def test_full_build(self):
+        session = self.session()
+        generated = self.build(session)
+        self.assertEqual(
+            sorted(generated),
+            [
+                os.path.join(self.public, "blog", "index.html"),
+                os.path.join(self.public, "index.html"),
+            ],
+        )
+        self.assertTrue(os.path.isfile(os.path.join(self.public, "index.css")))
+        session.validate()
+
+    def test_incremental_build(self):
+        self.assertEqual(len(self.build(self.session(incremental=True))), 2)
+        self.assertEqual(self.build(self.session(incremental=True)), [])
+
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Posts")
+        session = self.session(incremental=True)
+        self.assertEqual(
+            self.build(session), [os.path.join(self.public, "blog", "index.html")]
+        )
+        explanation = session.explain(os.path.join(self.content, "blog", "index.md"))
+        self.assertIn("  last rebuilt because: source changed", explanation)
+
+    def test_front_matter_template(self):
+        post_template = os.path.join(self.root, "post.html")
+        self.write(post_template, "<h1>{{ Title }}</h1>")
+        post = os.path.join(self.content, "blog", "index.md")
+        self.write(post, "---\ntemplate: post.html\n---\n# Blog")
+        session = self.session(incremental=True)
+        self.assertEqual(session.render_page("blog/index.md"), "<h1>Blog</h1>")
+
+        self.build(session)
+        self.assertIn(post_template, session.dev_session().watched_paths())
+        self.assertEqual(
+            session.explain(post)[-1], "  next incremental build: up to date"
+        )
+        self.write(post_template, "<h2>{{ Title }}</h2>")
+        self.assertEqual(
+            session.explain(post)[-1],
+            "  next incremental build: rebuild (template changed)",
+        )
+
+        dev_session = session.dev_session()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(dev_session.rebuild({post_template}))
+        self.assertEqual(self.read("blog", "index.html"), "<h2>Blog</h2>")
+
+    def test_header_errors_are_aggregated(self):
+        untitled = os.path.join(self.content, "notitle.md")
+        self.write(untitled, "No title here")
+        bad_date = os.path.join(self.content, "blog", "dated.md")
+        self.write(bad_date, "---\ndate: soon\n---\n# Dated")
+        for options in (
+            {"workers": 2},
+            {"pipeline": True},
+            {"incremental": True},
+        ):
+            with self.subTest(**options):
+                with self.assertRaises(BuildError) as context:
+                    self.build(self.session(**options))
+                self.assertEqual(
+                    [path for path, _ in context.exception.failures],
+                    [bad_date, untitled],
+                )
+                self.assertIn(f"{untitled}: No title given!", str(context.exception))
+                # The other pages are still rendered.
+                self.assertTrue(
+                    os.path.isfile(os.path.join(self.public, "blog", "index.html"))
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
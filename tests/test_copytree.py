@@ -0,0 +1,129 @@
+import os
+import unittest
+from unittest import mock
+
+from src import copy_file, copytree, sync_tree
+from tests.site_fixture import SiteFixture
+
+
+class StaticDirTestCase(SiteFixture, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+
+
+class TestCopyTree(StaticDirTestCase):
+    def test_copytree(self):
+        stats = copytree(self.static, self.public)
+        self.assertEqual(self.read("index.css"), "body {}")
+        self.assertEqual(self.read("images", "a.png"), "png")
+        self.assertEqual(stats.files, 2)
+        self.assertEqual(stats.bytes, len("body {}") + len("png"))
+
+    def test_copytree_serial_with_progress(self):
+        seen = []
+        copytree(
+            self.static,
+            self.public,
+            workers=1,
+            progress=lambda stats: seen.append(stats.files),
+        )
+        self.assertEqual(seen, [1, 2])
+
+    def test_copy_file_large(self):
+        data = os.urandom(3 * 1024 * 1024 + 7)
+        src_path = os.path.join(self.static, "big.bin")
+        with open(src_path, "wb") as f:
+            f.write(data)
+        os.chmod(src_path, 0o640)
+
+        dest_path = os.path.join(self.root, "big.bin")
+        self.assertEqual(copy_file(src_path, dest_path), len(data))
+        with open(dest_path, "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(os.stat(dest_path).st_mode & 0o777, 0o640)
+
+    def test_copy_file_without_zero_copy(self):
+        src_path = os.path.join(self.static, "index.css")
+        dest_path = os.path.join(self.root, "index.css")
+        with mock.patch("copytree.ZERO_COPY_METHODS", []):
+            self.assertEqual(copy_file(src_path, dest_path), len("body {}"))
+        with open(dest_path) as f:
+            self.assertEqual(f.read(), "body {}")
+
+    def test_copy_file_falls_back_when_nothing_is_sent(self):
+        src_path = os.path.join(self.static, "index.css")
+        dest_path = os.path.join(self.root, "index.css")
+
+        def stalls(src_fd, dest_fd, offset, count):
+            if offset:
+                return 0
+            os.lseek(dest_fd, 0, os.SEEK_SET)
+            return os.write(dest_fd, os.pread(src_fd, 3, 0))
+
+        with mock.patch("copytree.ZERO_COPY_METHODS", [stalls]):
+            self.assertEqual(copy_file(src_path, dest_path), len("body {}"))
+        with open(dest_path) as f:
+            self.assertEqual(f.read(), "body {}")
+
+    def test_missing_source(self):
+        with self.assertRaises(ValueError):
+            copytree(os.path.join(self.root, "missing"), self.public)
+        with self.assertRaises(ValueError):
+            sync_tree(os.path.join(self.root, "missing"), self.public)
+
+
+class TestSyncTree(StaticDirTestCase):
+    def test_only_changed_files_are_copied(self):
+        synced, stats = sync_tree(self.static, self.public)
+        self.assertEqual(synced, {"index.css", os.path.join("images", "a.png")})
+        self.assertEqual(sorted(stats.paths), sorted(synced))
+
+        synced, stats = sync_tree(self.static, self.public, synced)
+        self.assertEqual(stats.paths, [])
+
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        _, stats = sync_tree(self.static, self.public, synced)
+        self.assertEqual(stats.paths, ["index.css"])
+        self.assertEqual(self.read("index.css"), "body { margin: 0 }")
+
+    def test_checksum_detects_same_size_edits(self):
+        synced, _ = sync_tree(self.static, self.public)
+        path = os.path.join(self.static, "index.css")
+        stat = os.stat(path)
+        self.write(path, "body {x")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        _, stats = sync_tree(self.static, self.public, synced)
+        self.assertEqual(stats.paths, [])
+        _, stats = sync_tree(self.static, self.public, synced, checksum=True)
+        self.assertEqual(stats.paths, ["index.css"])
+
+    def test_orphans_are_removed_but_pages_are_kept(self):
+        synced, _ = sync_tree(self.static, self.public)
+        self.write(os.path.join(self.public, "index.html"), "<p>page</p>")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+
+        synced, _ = sync_tree(self.static, self.public, synced)
+        self.assertEqual(synced, {"index.css"})
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images", "a.png")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_hardlink(self):
+        sync_tree(self.static, self.public, link="hardlink")
+        src_path = os.path.join(self.static, "index.css")
+        dest_path = os.path.join(self.public, "index.css")
+        self.assertTrue(os.path.samefile(src_path, dest_path))
+
+    def test_reflink_falls_back_to_copy(self):
+        sync_tree(self.static, self.public, link="reflink")
+        self.assertEqual(self.read("index.css"), "body {}")
+
+    def test_unknown_link_mode(self):
+        with self.assertRaises(ValueError):
+            sync_tree(self.static, self.public, link="symlink")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import os
+import tempfile
+import unittest
+
+from src import (
+    DependencyGraph,
+    Manifest,
+    Reference,
+    extract_references,
+    generate_pages_incremental,
+    reference_path,
+)
+from tests.site_fixture import SiteFixture
+
+
+class TestExtractReferences(unittest.TestCase):
+    def test_images_and_links_with_line_numbers(self):
+        markdown = """# Title
+
+[Home](/) and ![logo](/images/logo.png) then [post](../post)
+
+```
+[not a link](/skipped)
+
+![nor an image](/skipped.png)
+```
+Final [anchor](#top)
+"""
+        self.assertEqual(
+            extract_references(markdown.splitlines()),
+            [
+                Reference("link", "/", 3),
+                Reference("image", "/images/logo.png", 3),
+                Reference("link", "../post", 3),
+                Reference("link", "#top", 10),
+            ],
+        )
+
+    def test_single_line_fence_is_not_opened(self):
+        lines = ["```inline```", "[link](/a)"]
+        self.assertEqual(extract_references(lines), [Reference("link", "/a", 2)])
+
+    def test_thematic_break_is_numbered_as_body(self):
+        lines = ["---", "Some text.", "---", "", "[link](/a)"]
+        self.assertEqual(extract_references(lines), [Reference("link", "/a", 5)])
+
+    def test_code_spans_and_front_matter(self):
+        lines = [
+            "---",
+            "title: Page",
+            "---",
+            "Use `[text](missing-page)` for links,",
+            "like [this](/a).",
+            "",
+            "> quoted",
+            "> ![img](/b.png)",
+            "",
+            "1. `![x](y)`",
+            "2. [two](/c)",
+        ]
+        self.assertEqual(
+            extract_references(lines),
+            [
+                Reference("link", "/a", 5),
+                Reference("image", "/b.png", 8),
+                Reference("link", "/c", 11),
+            ],
+        )
+
+
+class TestReferencePath(unittest.TestCase):
+    def test_site_relative_targets(self):
+        self.assertEqual(reference_path("/", "blog/index.html"), "index.html")
+        self.assertEqual(
+            reference_path("/majesty", "index.html"), "majesty/index.html"
+        )
+        self.assertEqual(
+            reference_path("/images/a%20b.png", "index.html"), "images/a b.png"
+        )
+
+    def test_relative_targets(self):
+        self.assertEqual(
+            reference_path("../post/", "blog/a/index.html"), "blog/post/index.html"
+        )
+        self.assertEqual(
+            reference_path("cover.png?v=2#x", "blog/index.html"), "blog/cover.png"
+        )
+
+    def test_external_and_anchor_targets(self):
+        self.assertIsNone(reference_path("https://example.com/a", "index.html"))
+        self.assertIsNone(reference_path("//cdn.example.com/a.js", "index.html"))
+        self.assertIsNone(reference_path("mailto:me@example.com", "index.html"))
+        self.assertIsNone(reference_path("#top", "index.html"))
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.record(
+            "content/index.md",
+            "index.html",
+            "./template.html",
+            [Reference("link", "/blog", 1)],
+            "full build",
+        )
+        self.graph.record(
+            "content/blog/index.md",
+            "blog/index.html",
+            "./template.html",
+            [
+                Reference("image", "/images/cover.png", 3),
+                Reference("link", "/", 4),
+                Reference("link", "https://example.com", 5),
+            ],
+            "source changed",
+        )
+
+    def test_record_splits_assets_and_links(self):
+        entry = self.graph.pages["content/blog/index.md"]
+        self.assertEqual(entry["assets"], ["images/cover.png"])
+        self.assertEqual(entry["links"], ["index.html"])
+        self.assertEqual(entry["template"], "template.html")
+
+    def test_dependents(self):
+        both = ["content/blog/index.md", "content/index.md"]
+        self.assertEqual(self.graph.dependents("template.html"), both)
+        self.assertEqual(
+            self.graph.dependents("images/cover.png"), ["content/blog/index.md"]
+        )
+        self.assertEqual(
+            self.graph.dependents("content/blog/index.md"), ["content/index.md"]
+        )
+        self.assertEqual(self.graph.dependents("index.html"), ["content/blog/index.md"])
+
+    def test_explain(self):
+        lines = self.graph.explain("blog/index.html", "template changed")
+        self.assertEqual(lines[0], "content/blog/index.md -> blog/index.html")
+        self.assertIn("  linked from: content/index.md", lines)
+        self.assertIn("  last rebuilt because: source changed", lines)
+        self.assertEqual(
+            lines[-1], "  next incremental build: rebuild (template changed)"
+        )
+        self.assertEqual(
+            self.graph.explain("missing.md"),
+            ["missing.md was not part of the last build."],
+        )
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "cache", "depgraph.json")
+            self.graph.save(path)
+            self.assertEqual(DependencyGraph.load(path).pages, self.graph.pages)
+
+
+class TestIncrementalGraph(SiteFixture, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, "{{ Title }}{{ Content }}")
+        self.index = os.path.join(self.content, "index.md")
+        self.about = os.path.join(self.content, "about.md")
+        self.write(self.index, "# Home\n\n[About](/about.html)")
+        self.write(self.about, "# About")
+
+    def build(self, manifest, graph):
+        return generate_pages_incremental(
+            self.content, self.template, self.public, manifest, graph=graph
+        )
+
+    def test_reasons_and_removed_pages(self):
+        manifest = Manifest()
+        graph = DependencyGraph()
+        self.build(manifest, graph)
+        self.assertEqual(graph.pages[self.index]["reason"], "not built before")
+        self.assertEqual(graph.dependents(self.about), [self.index])
+
+        self.write(self.index, "# Home again")
+        self.build(manifest, graph)
+        self.assertEqual(graph.pages[self.index]["reason"], "source changed")
+        self.assertEqual(graph.pages[self.about]["reason"], "not built before")
+        self.assertEqual(graph.dependents(self.about), [])
+
+        os.remove(self.about)
+        self.build(manifest, graph)
+        self.assertEqual(list(graph.pages), [self.index])
+
+
+if __name__ == "__main__":
+    unittest.main()
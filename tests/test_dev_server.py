@@ -0,0 +1,71 @@
+import os
+import threading
+import unittest
+
+from src import DevSession, LiveReload, Manifest
+from tests.site_fixture import SiteFixture
+
+
+class TestLiveReload(unittest.TestCase):
+    def test_wait_returns_new_version(self):
+        live_reload = LiveReload()
+        threading.Timer(0.05, live_reload.notify).start()
+        self.assertEqual(live_reload.wait(0, timeout=5), 1)
+
+    def test_wait_times_out(self):
+        live_reload = LiveReload()
+        self.assertEqual(live_reload.wait(0, timeout=0.01), 0)
+
+
+class TestDevSession(SiteFixture, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, "<title>{{ Title }}</title>")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        self.session = DevSession(
+            self.content, self.static, self.template, self.public, Manifest()
+        )
+
+    def test_changed_page_is_rebuilt_alone(self):
+        path = os.path.join(self.content, "blog", "index.md")
+        self.assertTrue(self.session.rebuild({path}))
+        self.assertEqual(self.read("blog", "index.html"), "<title>Blog</title>")
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.html")))
+        self.assertIn(path, self.session.manifest.pages)
+
+    def test_template_change_rebuilds_all_pages(self):
+        self.assertTrue(self.session.rebuild({self.template}))
+        self.assertEqual(self.read("index.html"), "<title>Home</title>")
+        self.assertEqual(self.read("blog", "index.html"), "<title>Blog</title>")
+
+    def test_deleted_page_is_removed(self):
+        path = os.path.join(self.content, "blog", "index.md")
+        self.session.rebuild({path})
+        os.remove(path)
+        self.assertTrue(self.session.rebuild({path}))
+        dest_path = os.path.join(self.public, "blog", "index.html")
+        self.assertFalse(os.path.exists(dest_path))
+
+    def test_static_files_are_synced(self):
+        path = os.path.join(self.static, "css", "site.css")
+        os.makedirs(os.path.dirname(path))
+        self.write(path, "body {}")
+        self.assertTrue(self.session.rebuild({path}))
+        self.assertEqual(self.read("css", "site.css"), "body {}")
+
+        os.remove(path)
+        self.assertTrue(self.session.rebuild({path}))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "css", "site.css")))
+
+    def test_unrelated_changes_are_ignored(self):
+        self.assertFalse(self.session.rebuild({os.path.join(self.root, "x.txt")}))
+
+    def test_failed_page_does_not_stop_the_session(self):
+        path = os.path.join(self.content, "index.md")
+        self.write(path, "no title")
+        self.assertFalse(self.session.rebuild({path}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from src import (
+    LeafNode,
+    escape_attribute,
+    escape_text,
+    markdown_to_html_node,
+    props_to_attributes,
+)
+
+
+class TestEscape(unittest.TestCase):
+    def test_escape_text(self):
+        self.assertEqual(escape_text("a < b && c > d"), "a &lt; b &amp;&amp; c &gt; d")
+        self.assertEqual(escape_text('say "hi"'), 'say "hi"')
+
+    def test_fast_path_returns_same_string(self):
+        text = "nothing to see here"
+        self.assertIs(escape_text(text), text)
+        self.assertIs(escape_attribute(text), text)
+
+    def test_escape_attribute(self):
+        self.assertEqual(
+            escape_attribute("/search?q=\"x\"&y='z'"),
+            "/search?q=&quot;x&quot;&amp;y=&#x27;z&#x27;",
+        )
+
+    def test_props_to_attributes(self):
+        self.assertEqual(props_to_attributes({}), "")
+        self.assertEqual(
+            props_to_attributes({"href": "/a?b=1&c=2", "title": "x"}),
+            ' href="/a?b=1&amp;c=2" title="x"',
+        )
+
+    def test_leaf_node_escapes_value_and_props(self):
+        node = LeafNode("a", "<script>", {"href": '"><script>'})
+        self.assertEqual(
+            node.to_html(), '<a href="&quot;&gt;&lt;script&gt;">&lt;script&gt;</a>'
+        )
+        self.assertEqual(LeafNode(None, "1 < 2").to_html(), "1 &lt; 2")
+
+    def test_markdown_is_escaped(self):
+        html = markdown_to_html_node(
+            "Fish & chips <b>\n\n```\n<div>\n```\n\n![a \"q\"](x.png)"
+        ).to_html()
+        self.assertEqual(
+            html,
+            "<div><p>Fish &amp; chips &lt;b&gt;</p>"
+            "<pre><code>&lt;div&gt;</code></pre>"
+            '<p><img src="x.png" alt="a &quot;q&quot;">a "q"</img></p></div>',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,15 @@
+import os
 import unittest
 
-from src import extract_title
+from src import (
+    BuildError,
+    collect_pages,
+    extract_title,
+    load_template,
+    render_page,
+    render_pages,
+)
+from tests.site_fixture import SiteFixture
 
 
 class TestExtractTitle(unittest.TestCase):
@@ -46,5 +55,65 @@ no title
             pass
 
 
+class TestRenderPages(SiteFixture, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, "<title> {{ Title }} </title>{{ Content }}")
+        for i in range(4):
+            page = os.path.join(self.content, f"page{i}", "index.md")
+            self.write(page, f"# Page {i}")
+
+    def test_collect_pages_is_sorted(self):
+        pages = collect_pages(self.content, self.public)
+        self.assertEqual(
+            pages,
+            [
+                (
+                    os.path.join(self.content, f"page{i}", "index.md"),
+                    os.path.join(self.public, f"page{i}", "index.html"),
+                )
+                for i in range(4)
+            ],
+        )
+
+    def test_parallel_matches_serial(self):
+        pages = collect_pages(self.content, self.public)
+        render_pages(pages, self.template, workers=1)
+        serial = [self.read(dest) for _, dest in pages]
+        for _, dest in pages:
+            os.remove(dest)
+
+        render_pages(pages, self.template, workers=2)
+        self.assertEqual([self.read(dest) for _, dest in pages], serial)
+
+    def test_streamed_page_matches_in_memory(self):
+        source = os.path.join(self.content, "page0", "index.md")
+        self.write(source, "Intro\n\n# Log\n\n```\na\n\nb\n```\n\n- **one**\n- two\n")
+        template = load_template(self.template)
+        in_memory = os.path.join(self.public, "memory.html")
+        streamed = os.path.join(self.public, "streamed.html")
+
+        render_page(source, template, in_memory)
+        render_page(source, template, streamed, stream_threshold=0)
+
+        with open(in_memory) as a, open(streamed) as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_errors_are_aggregated(self):
+        for i in (1, 3):
+            self.write(os.path.join(self.content, f"page{i}", "index.md"), "no title")
+
+        pages = collect_pages(self.content, self.public)
+        with self.assertRaises(BuildError) as context:
+            render_pages(pages, self.template, workers=2)
+
+        self.assertEqual(
+            [path for path, _ in context.exception.failures],
+            [pages[1][0], pages[3][0]],
+        )
+        self.assertTrue(os.path.exists(pages[0][1]))
+        self.assertTrue(os.path.exists(pages[2][1]))
+
+
 if __name__ == "__main__":
     unittest.main()
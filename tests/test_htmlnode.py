@@ -1,3 +1,4 @@
+import io
 import unittest
 from src import HTMLNode, LeafNode, ParentNode
 
@@ -76,6 +77,21 @@ class TestLeafNode(unittest.TestCase):
             "LeafNode(a, Link, {'href': 'https://example.com', 'target': '_blank'})",
         )
 
+    def test_leaf_node_props_are_writable(self):
+        """Test props of a leaf built without any can still be set."""
+        first = LeafNode("a", "First")
+        second = LeafNode("a", "Second")
+        first.props["href"] = "https://example.com"
+        self.assertEqual(first.to_html(), '<a href="https://example.com">First</a>')
+        self.assertEqual(second.props, {})
+        self.assertEqual(second.to_html(), "<a>Second</a>")
+
+    def test_leaf_node_is_slotted(self):
+        """Test leaves carry no instance dict and no children list."""
+        node = LeafNode("p", "Leaf content")
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(node.children, ())
+
     def test_leaf_node_empty_props(self):
         """Test LeafNode with empty props."""
         node = LeafNode(tag="p", value="Empty props", props={})
@@ -149,6 +165,31 @@ class TestParentNode(unittest.TestCase):
             "<div>    Text with spaces   </div>",
         )
 
+    def test_iter_html_fragments(self):
+        node = ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, "text")])
+        self.assertEqual(
+            list(node.iter_html()), ["<p>", "<b>Bold</b>", "text", "</p>"]
+        )
+
+    def test_write_to_stream(self):
+        node = ParentNode("div", [ParentNode("span", [LeafNode(None, "Text")])])
+        stream = io.StringIO()
+        node.write_to(stream)
+        self.assertEqual(stream.getvalue(), "<div><span>Text</span></div>")
+
+    def test_deeply_nested_tree(self):
+        node = LeafNode(None, "deep")
+        for _ in range(5000):
+            node = ParentNode("blockquote", [node])
+        html = node.to_html()
+        self.assertEqual(len(html), 5000 * len("<blockquote></blockquote>") + 4)
+        self.assertTrue(html.startswith("<blockquote><blockquote>"))
+
+    def test_nested_error_raised_while_streaming(self):
+        node = ParentNode("div", [ParentNode("span", [])])
+        with self.assertRaises(ValueError):
+            node.write_to(io.StringIO())
+
 
 if __name__ == "__main__":
     unittest.main()
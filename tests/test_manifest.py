@@ -0,0 +1,103 @@
+import os
+import unittest
+
+from src import Manifest, generate_pages_incremental
+from tests.site_fixture import SiteFixture
+
+
+TEMPLATE = "<title> {{ Title }} </title>{{ Content }}"
+
+
+class TestManifest(SiteFixture, unittest.TestCase):
+    def test_save_and_load(self):
+        path = os.path.join(self.root, "cache", "manifest.json")
+        manifest = Manifest(path)
+        manifest.record("content/index.md", "abc", "def", "public/index.html")
+        manifest.save()
+
+        loaded = Manifest.load(path)
+        self.assertEqual(loaded.pages, manifest.pages)
+
+    def test_load_missing_file(self):
+        manifest = Manifest.load(os.path.join(self.root, "missing.json"))
+        self.assertEqual(manifest.pages, {})
+
+    def test_is_fresh_requires_output(self):
+        dest = os.path.join(self.root, "index.html")
+        manifest = Manifest()
+        manifest.record("index.md", "abc", "def", dest)
+        self.assertFalse(manifest.is_fresh("index.md", "abc", "def", dest))
+
+        open(dest, "w").close()
+        self.assertTrue(manifest.is_fresh("index.md", "abc", "def", dest))
+        self.assertFalse(manifest.is_fresh("index.md", "changed", "def", dest))
+        self.assertFalse(manifest.is_fresh("index.md", "abc", "changed", dest))
+
+    def test_stale_reason(self):
+        dest = os.path.join(self.root, "index.html")
+        manifest = Manifest()
+        self.assertEqual(
+            manifest.stale_reason("index.md", "abc", "def", dest), "not built before"
+        )
+        manifest.record("index.md", "abc", "def", dest)
+        self.assertEqual(
+            manifest.stale_reason("index.md", "abc", "def", dest), "output missing"
+        )
+        open(dest, "w").close()
+        self.assertIsNone(manifest.stale_reason("index.md", "abc", "def", dest))
+        self.assertEqual(
+            manifest.stale_reason("index.md", "new", "def", dest), "source changed"
+        )
+        self.assertEqual(
+            manifest.stale_reason("index.md", "abc", "new", dest), "template changed"
+        )
+
+    def test_remove_missing(self):
+        manifest = Manifest()
+        manifest.record("a.md", "1", "t", "a.html")
+        manifest.record("b.md", "2", "t", "b.html")
+        self.assertEqual(manifest.remove_missing({"a.md"}), ["b.html"])
+        self.assertEqual(list(manifest.pages), ["a.md"])
+
+
+class TestGeneratePagesIncremental(SiteFixture, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, TEMPLATE)
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        self.manifest = Manifest(os.path.join(self.root, "manifest.json"))
+
+    def build(self):
+        return generate_pages_incremental(
+            self.content, self.template, self.public, self.manifest
+        )
+
+    def test_only_changed_pages_are_rebuilt(self):
+        self.assertEqual(len(self.build()), 2)
+        self.assertEqual(self.build(), [])
+
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog 2")
+        self.assertEqual(
+            self.build(), [os.path.join(self.public, "blog", "index.html")]
+        )
+
+    def test_template_change_rebuilds_everything(self):
+        self.build()
+        self.write(self.template, "<h1>{{ Content }}</h1>")
+        self.assertEqual(len(self.build()), 2)
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        self.build()
+        self.assertFalse(
+            os.path.exists(os.path.join(self.public, "blog", "index.html"))
+        )
+        self.assertNotIn(
+            os.path.join(self.content, "blog", "index.md"), self.manifest.pages
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,11 @@ from src import (
     block_to_block_type,
     markdown_to_html_node,
     extract_title,
+    extract_page_header,
+    parse_page,
+    scan_blocks,
+    split_front_matter,
+    stream_markdown_html,
 )
 
 
@@ -120,6 +125,53 @@ class TestTextToTextNodes(unittest.TestCase):
         ]
         self.assertEqual(nodes, expected)
 
+    def test_image_and_link(self):
+        """Test adjacent image and link are both recognised in one pass."""
+        text = "![img](/a.png)[link](/b)"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("img", TextType.IMAGE, "/a.png"),
+            TextNode("link", TextType.LINK, "/b"),
+        ]
+        self.assertEqual(nodes, expected)
+
+    def test_code_span_precedence(self):
+        """Test emphasis markers inside inline code stay literal."""
+        text = "Use `a * b` and **bold**"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("Use ", TextType.TEXT),
+            TextNode("a * b", TextType.CODE),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+        ]
+        self.assertEqual(nodes, expected)
+
+    def test_markers_inside_link(self):
+        """Test emphasis markers inside a link label and url stay literal."""
+        text = "See [*the* docs](/a*b)"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("See ", TextType.TEXT),
+            TextNode("*the* docs", TextType.LINK, "/a*b"),
+        ]
+        self.assertEqual(nodes, expected)
+
+    def test_literal_brackets_and_bang(self):
+        """Test brackets and bangs that do not form a link stay text."""
+        text = "Wow! [not a link] here"
+        self.assertEqual(text_to_textnodes(text), [TextNode(text, TextType.TEXT)])
+
+    def test_open_delimiter(self):
+        """Test an unclosed delimiter raises."""
+        with self.assertRaises(Exception) as context:
+            text_to_textnodes("This is **unclosed")
+        self.assertEqual(str(context.exception), "Open delimiter detected!")
+
+    def test_empty_text(self):
+        """Test empty text yields no nodes."""
+        self.assertEqual(text_to_textnodes(""), [])
+
 
 class TestGetMarkdownBlocks(unittest.TestCase):
     def test_basic_markdown(self):
@@ -191,6 +243,46 @@ This is a paragraph.
         expected = ["# Heading\nThis is a paragraph.\n* List item 1\n* List item 2"]
         self.assertEqual(markdown_to_blocks(markdown), expected)
 
+    def test_whitespace_only_separator(self):
+        markdown = "First paragraph\n   \t\nSecond paragraph"
+        expected = ["First paragraph", "Second paragraph"]
+        self.assertEqual(markdown_to_blocks(markdown), expected)
+
+    def test_code_fence_keeps_blank_lines(self):
+        markdown = "Intro\n\n```\nfirst\n\n\nsecond\n```\n\nOutro"
+        expected = ["Intro", "```\nfirst\n\n\nsecond\n```", "Outro"]
+        self.assertEqual(markdown_to_blocks(markdown), expected)
+
+    def test_unclosed_code_fence(self):
+        markdown = "```\ncode\n\nmore code"
+        self.assertEqual(markdown_to_blocks(markdown), ["```\ncode\n\nmore code"])
+
+
+class TestScanBlocks(unittest.TestCase):
+    def test_blocks_with_types(self):
+        markdown = "# Title\n\n> quoted\n\n- one\n- two\n\n1. a\n2. b\n\n```\nx\n```"
+        self.assertEqual(
+            list(scan_blocks(markdown.splitlines())),
+            [
+                ("# Title", "heading"),
+                ("> quoted", "quote"),
+                ("- one\n- two", "unordered_list"),
+                ("1. a\n2. b", "ordered_list"),
+                ("```\nx\n```", "code"),
+            ],
+        )
+
+    def test_file_lines(self):
+        lines = ["  Some text  \n", "more\n", "\n", "- item\n"]
+        self.assertEqual(
+            list(scan_blocks(lines)),
+            [("Some text  \nmore", "paragraph"), ("- item", "unordered_list")],
+        )
+
+    def test_mixed_list_is_paragraph(self):
+        lines = ["- one", "2. two"]
+        self.assertEqual(list(scan_blocks(lines)), [("- one\n2. two", "paragraph")])
+
 
 class TestBlockToBlockType(unittest.TestCase):
     def test_heading(self):
@@ -276,6 +368,80 @@ class TestMarkdownToHTMLNode(unittest.TestCase):
         self.assertEqual(node_to_dict(html_node), node_to_dict(expected))
 
 
+class TestStreamMarkdownHTML(unittest.TestCase):
+    def test_matches_tree_rendering(self):
+        markdown = "# Title\n\nSome *text*\n\n> quote\n\n1. a\n2. b\n\n```\ncode\n```"
+        lines = iter(markdown.splitlines(keepends=True))
+        self.assertEqual(
+            "".join(stream_markdown_html(lines)),
+            markdown_to_html_node(markdown).to_html(),
+        )
+
+    def test_blocks_are_emitted_lazily(self):
+        def lines():
+            yield "first block\n"
+            yield "\n"
+            raise AssertionError("read past the first block")
+
+        fragments = stream_markdown_html(lines())
+        self.assertEqual(next(fragments), "<div>")
+        self.assertEqual(next(fragments), "<p>")
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split_front_matter(self):
+        lines = ["---", "title: 'Quoted: yes'", "", "tags: a, b", "---", "# T"]
+        front_matter, body = split_front_matter(lines)
+        self.assertEqual(front_matter, {"title": "Quoted: yes", "tags": "a, b"})
+        self.assertEqual(list(body), ["# T"])
+
+    def test_thematic_break_is_not_front_matter(self):
+        lines = ["---", "", "Some text.", "Note: not a field", "---", "# T"]
+        front_matter, body = split_front_matter(lines)
+        self.assertEqual(front_matter, {})
+        self.assertEqual(list(body), lines)
+        markdown = "\n".join(lines)
+        self.assertEqual(parse_page(markdown)[1], "T")
+        self.assertIn("Some text.", markdown_to_html_node(markdown).to_html())
+
+    def test_unclosed_fence_is_body(self):
+        lines = ["---", "title: x", "", "text"]
+        front_matter, body = split_front_matter(lines)
+        self.assertEqual(front_matter, {})
+        self.assertEqual(list(body), lines)
+
+    def test_front_matter_is_not_rendered(self):
+        markdown = "---\ndate: 2024-01-01\n---\n\n# Title\n\ntext"
+        front_matter, title, node = parse_page(markdown)
+        self.assertEqual(front_matter, {"date": "2024-01-01"})
+        self.assertEqual(title, "Title")
+        self.assertEqual(node.to_html(), "<div><h1>Title</h1><p>text</p></div>")
+        lines = iter(markdown.splitlines(keepends=True))
+        self.assertEqual("".join(stream_markdown_html(lines)), node.to_html())
+
+    def test_page_header_stops_at_title(self):
+        def lines():
+            yield "---\n"
+            yield "tags: a\n"
+            yield "---\n"
+            yield "# Title\n"
+            yield "\n"
+            raise AssertionError("read past the title")
+
+        self.assertEqual(extract_page_header(lines()), ({"tags": "a"}, "Title"))
+        self.assertEqual(
+            extract_page_header(["---", "title: Front", "---", "# Heading"]),
+            ({"title": "Front"}, "Front"),
+        )
+
+    def test_title_inside_a_block(self):
+        markdown = "intro text\n# Title\n\nbody"
+        self.assertEqual(extract_title(markdown), "Title")
+        self.assertEqual(parse_page(markdown)[1], "Title")
+        lines = markdown.splitlines()
+        self.assertEqual(extract_page_header(lines), ({}, "Title"))
+
+
 class TestExtractTitle(unittest.TestCase):
     def test_single_title(self):
         """Test when there is a single title in the markdown."""
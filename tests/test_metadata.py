@@ -0,0 +1,140 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from src import (
+    Manifest,
+    MetadataIndex,
+    PageMetadata,
+    generate_pages_incremental,
+    generate_pages_recursive,
+    page_metadata,
+    parse_tags,
+)
+from tests.site_fixture import SiteFixture
+
+
+class TestPageMetadata(unittest.TestCase):
+    def test_known_fields(self):
+        front_matter = {
+            "date": "2024-03-09T10:00:00",
+            "tags": "[python, 'web' ,]",
+            "draft": "yes",
+            "template": "post.html",
+            "author": "Ann",
+        }
+        entry = page_metadata("content/a.md", "a.html", front_matter, "A")
+        self.assertEqual(entry.date, "2024-03-09")
+        self.assertEqual(entry.tags, ("python", "web"))
+        self.assertTrue(entry.draft)
+        self.assertEqual(entry.template, "post.html")
+        self.assertEqual(entry.fields["author"], "Ann")
+
+    def test_defaults(self):
+        entry = page_metadata("content/a.md", "a.html", {}, "A")
+        self.assertEqual(
+            entry,
+            PageMetadata("content/a.md", "a.html", "A", None, (), False, None, {}),
+        )
+        self.assertEqual(parse_tags("one, two"), ("one", "two"))
+
+    def test_invalid_date(self):
+        with self.assertRaises(ValueError) as context:
+            page_metadata("content/a.md", "a.html", {"date": "soon"}, "A")
+        self.assertEqual(str(context.exception), "Invalid date in front matter: soon")
+
+
+class TestMetadataIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = MetadataIndex()
+        for source, front_matter in (
+            ("old.md", {"date": "2023-01-01", "tags": "a, b"}),
+            ("new.md", {"date": "2024-01-01", "tags": "b"}),
+            ("undated.md", {"tags": "a"}),
+            ("draft.md", {"date": "2025-01-01", "tags": "a", "draft": "true"}),
+            ("custom.md", {"template": "post.html"}),
+        ):
+            output = source.replace(".md", ".html")
+            entry = page_metadata(source, output, front_matter, source)
+            self.index.pages[source] = entry
+
+    def test_published_newest_first(self):
+        self.assertEqual(
+            [entry.source for entry in self.index.published()],
+            ["new.md", "old.md", "custom.md", "undated.md"],
+        )
+
+    def test_tags(self):
+        tags = self.index.tags()
+        self.assertEqual(list(tags), ["a", "b"])
+        self.assertEqual(
+            [entry.source for entry in tags["a"]], ["old.md", "undated.md"]
+        )
+
+    def test_templates_are_relative_to_the_default(self):
+        self.assertEqual(
+            self.index.templates(os.path.join("site", "template.html")),
+            {"custom.md": os.path.join("site", "post.html")},
+        )
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "cache", "metadata.json")
+            self.index.save(path)
+            self.assertEqual(MetadataIndex.load(path).pages, self.index.pages)
+
+
+class TestFrontMatterBuild(SiteFixture, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, "<title>{{ Title }}</title>{{ author }}{{ Content }}")
+        post_template = os.path.join(self.root, "post.html")
+        self.write(post_template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.post = os.path.join(self.content, "post.md")
+        self.draft = os.path.join(self.content, "draft.md")
+        self.write(
+            self.post,
+            "---\ntitle: Front <Title>\nauthor: Ann & Bo\n---\n# Heading\n\nText",
+        )
+        self.write(self.draft, "---\ndraft: true\n---\n# Draft")
+
+    def test_front_matter_values_and_drafts(self):
+        index = MetadataIndex()
+        with contextlib.redirect_stdout(io.StringIO()):
+            generated = generate_pages_recursive(
+                self.content, self.template, self.public, metadata=index
+            )
+        self.assertEqual(generated, [os.path.join(self.public, "post.html")])
+        self.assertEqual(
+            self.read("post.html"),
+            "<title>Front &lt;Title&gt;</title>Ann &amp; Bo"
+            "<div><h1>Heading</h1><p>Text</p></div>",
+        )
+        self.assertTrue(index.pages[self.draft].draft)
+        self.assertEqual(index.pages[self.post].title, "Front <Title>")
+
+    def test_incremental_template_and_draft(self):
+        manifest = Manifest()
+        index = MetadataIndex()
+        self.write(self.post, "---\ntemplate: post.html\n---\n# Post")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_incremental(
+                self.content, self.template, self.public, manifest, metadata=index
+            )
+            self.assertEqual(
+                self.read("post.html"), "<h1>Post</h1><div><h1>Post</h1></div>"
+            )
+
+            self.write(self.post, "---\ndraft: yes\n---\n# Post")
+            generated = generate_pages_incremental(
+                self.content, self.template, self.public, manifest, metadata=index
+            )
+        self.assertEqual(generated, [])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "post.html")))
+        self.assertEqual(manifest.pages, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from src import create_output_dirs, open_output, output_dirs, write_output
+
+
+class TestOutputDirs(unittest.TestCase):
+    def test_only_deepest_dirs_are_listed(self):
+        dest_paths = [
+            "public/index.html",
+            "public/blog/index.html",
+            "public/blog/post/index.html",
+            "public/blog/post/other.html",
+            "public/blog-archive/index.html",
+            "index.html",
+        ]
+        self.assertEqual(
+            output_dirs(dest_paths), ["public/blog-archive", "public/blog/post"]
+        )
+
+    def test_create_output_dirs(self):
+        with tempfile.TemporaryDirectory() as root:
+            dest_paths = [
+                os.path.join(root, "a", "index.html"),
+                os.path.join(root, "a", "b", "c", "index.html"),
+                os.path.join(root, "d", "index.html"),
+            ]
+            create_output_dirs(dest_paths)
+            for path in dest_paths:
+                self.assertTrue(os.path.isdir(os.path.dirname(path)))
+
+
+class TestWriteOutput(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "blog", "index.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_write_creates_dirs(self):
+        write_output(self.dest, "<p>hi</p>")
+        with open(self.dest) as f:
+            self.assertEqual(f.read(), "<p>hi</p>")
+
+    def test_without_create_dirs(self):
+        with self.assertRaises(FileNotFoundError):
+            write_output(self.dest, "<p>hi</p>", create_dirs=False)
+
+    def test_atomic_write_replaces_page(self):
+        write_output(self.dest, "old")
+        write_output(self.dest, "new", atomic=True)
+        with open(self.dest) as f:
+            self.assertEqual(f.read(), "new")
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+    def test_failed_atomic_write_keeps_old_page(self):
+        write_output(self.dest, "old")
+        with self.assertRaises(RuntimeError):
+            with open_output(self.dest, atomic=True) as f:
+                f.write("partial")
+                raise RuntimeError("render failed")
+
+        with open(self.dest) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+    def test_failed_write_removes_partial_page(self):
+        write_output(self.dest, "old")
+        with self.assertRaises(RuntimeError):
+            with open_output(self.dest) as f:
+                f.write("partial")
+                raise RuntimeError("render failed")
+
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src import (
+    NULL_PROFILER,
+    PAGE_STAGES,
+    BuildProfiler,
+    collect_pages,
+    percentile,
+    render_pages,
+)
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def test_stages_accumulate_per_page(self):
+        profiler = BuildProfiler()
+        with profiler.page("a.md"):
+            with profiler.stage("read"):
+                pass
+            with profiler.stage("read"):
+                pass
+        with profiler.stage("static_copy"):
+            pass
+
+        self.assertEqual(list(profiler.pages), ["a.md"])
+        self.assertEqual(list(profiler.pages["a.md"]), ["read"])
+        self.assertEqual(list(profiler.build_stages), ["static_copy"])
+
+    def test_summary(self):
+        profiler = BuildProfiler()
+        for i in range(1, 21):
+            profiler.merge({f"{i}.md": {"read": i / 1000, "write": 0.001}})
+
+        summary = profiler.summary(slowest=3)
+        self.assertEqual(summary["pages"], 20)
+        self.assertAlmostEqual(summary["stages"]["read"]["total"], 0.21)
+        self.assertAlmostEqual(summary["stages"]["read"]["p50"], 0.010)
+        self.assertAlmostEqual(summary["stages"]["read"]["p95"], 0.019)
+        self.assertAlmostEqual(summary["stages"]["read"]["max"], 0.020)
+        self.assertEqual(
+            [page["path"] for page in summary["slowest"]], ["20.md", "19.md", "18.md"]
+        )
+        self.assertIn("Slowest 3 pages:", profiler.report_text(slowest=3))
+
+    def test_percentile_empty(self):
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_null_profiler(self):
+        self.assertFalse(NULL_PROFILER.enabled)
+        with NULL_PROFILER.page("a.md"):
+            with NULL_PROFILER.stage("read"):
+                pass
+
+
+class TestProfiledBuild(unittest.TestCase):
+    def test_every_page_stage_is_timed(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(content)
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            with open(os.path.join(content, "index.md"), "w") as f:
+                f.write("# Home\n\nSome **text**")
+
+            profiler = BuildProfiler()
+            pages = collect_pages(content, os.path.join(root, "public"))
+            render_pages(pages, template, profiler=profiler)
+
+            self.assertEqual(set(profiler.pages[pages[0][0]]), set(PAGE_STAGES))
+            with open(pages[0][1]) as f:
+                self.assertEqual(
+                    f.read(),
+                    "<title>Home</title><div><h1>Home</h1><p>Some <b>text</b></p></div>",
+                )
+
+            json_path = os.path.join(root, "profile.json")
+            profiler.write_json(json_path)
+            with open(json_path) as f:
+                self.assertEqual(json.load(f)["pages"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import pickle
+import tempfile
+import time
+import unittest
+
+from src import RenderCache, Template, render_page
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RenderCache(os.path.join(self.tmp.name, "cache", "pages.sqlite"))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_get_and_put(self):
+        key = RenderCache.key("# Home", "template")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, "<h1>Home</h1>")
+        self.assertEqual(self.cache.get(key), "<h1>Home</h1>")
+        updates = self.cache.take_updates()
+        self.assertEqual((updates["hits"], updates["misses"]), (1, 1))
+        updates = self.cache.take_updates()
+        self.assertEqual((updates["hits"], updates["misses"]), (0, 0))
+
+    def test_writes_wait_for_flush(self):
+        self.cache.put("a", "html")
+        other = RenderCache(self.cache.path)
+        self.assertIsNone(other.get("a"))
+        self.cache.flush()
+        self.assertEqual(other.get("a"), "html")
+        other.close()
+
+    def test_worker_updates_are_written_by_the_parent(self):
+        self.cache.create()
+        worker = pickle.loads(pickle.dumps(self.cache))
+        self.assertIsNone(worker.get("a"))
+        worker.put("a", "html")
+        self.cache.apply_updates(worker.take_updates())
+        self.cache.flush()
+        self.assertEqual(self.cache.stats(), "0 hit(s), 1 miss(es)")
+        self.assertEqual(worker.get("a"), "html")
+        worker.close()
+
+    def test_key_depends_on_markdown_and_template(self):
+        key = RenderCache.key("# Home", "a")
+        self.assertEqual(key, RenderCache.key("# Home", "a"))
+        self.assertNotEqual(key, RenderCache.key("# Home", "b"))
+        self.assertNotEqual(key, RenderCache.key("# Away", "a"))
+
+    def test_least_recently_used_pages_are_evicted(self):
+        self.cache.max_bytes = 10
+        for key in ("a", "b", "c"):
+            self.cache.put(key, "12345")
+            time.sleep(0.01)
+        self.cache.get("a")
+
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+    def test_clear(self):
+        self.cache.put("a", "html")
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.total_size(), 0)
+
+    def test_pickle_drops_connection(self):
+        self.cache.put("a", "html")
+        self.cache.flush()
+        copy = pickle.loads(pickle.dumps(self.cache))
+        self.assertEqual(copy.get("a"), "html")
+        copy.close()
+
+
+class TestCachedRenderPage(unittest.TestCase):
+    def test_cached_html_is_reused(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "index.md")
+            dest = os.path.join(root, "public", "index.html")
+            with open(source, "w") as f:
+                f.write("# Home")
+            template = Template("<title>{{ Title }}</title>{{ Content }}")
+            cache = RenderCache(os.path.join(root, "pages.sqlite"))
+
+            render_page(source, template, dest, render_cache=cache)
+            with open(dest) as f:
+                self.assertEqual(f.read(), "<title>Home</title><div><h1>Home</h1></div>")
+
+            key = RenderCache.key("# Home", template.digest)
+            self.assertEqual(
+                cache.get(key), "<title>Home</title><div><h1>Home</h1></div>"
+            )
+            cache.put(key, "from cache")
+            render_page(source, template, dest, render_cache=cache)
+            with open(dest) as f:
+                self.assertEqual(f.read(), "from cache")
+
+            render_page(source, Template("{{ Title }}"), dest, render_cache=cache)
+            with open(dest) as f:
+                self.assertEqual(f.read(), "Home")
+            cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
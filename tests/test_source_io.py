@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from src import iter_source_lines, read_source, use_mmap
+
+
+class TestSourceIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "page.md")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, data: bytes) -> None:
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+    def test_use_mmap_threshold(self):
+        self.write(b"# Title\n")
+        self.assertTrue(use_mmap(self.path, threshold=0))
+        self.assertTrue(use_mmap(self.path, threshold=8))
+        self.assertFalse(use_mmap(self.path, threshold=9))
+
+    def test_empty_file_is_never_mapped(self):
+        self.write(b"")
+        self.assertFalse(use_mmap(self.path, threshold=0))
+        self.assertEqual(read_source(self.path, threshold=0), "")
+        self.assertEqual(list(iter_source_lines(self.path, threshold=0)), [])
+
+    def test_mapped_read_matches_regular_read(self):
+        self.write("# Título\n\nline one\nline two".encode())
+        self.assertEqual(
+            read_source(self.path, threshold=0), read_source(self.path, threshold=1024)
+        )
+
+    def test_mapped_lines_match_regular_lines(self):
+        self.write("# Título\n\nline one\nline two".encode())
+        self.assertEqual(
+            list(iter_source_lines(self.path, threshold=0)),
+            ["# Título\n", "\n", "line one\n", "line two"],
+        )
+        self.assertEqual(
+            list(iter_source_lines(self.path, threshold=0)),
+            list(iter_source_lines(self.path, threshold=1024)),
+        )
+
+    def test_newlines_are_translated(self):
+        self.write(b"a\r\nb\rc\n")
+        self.assertEqual(read_source(self.path, threshold=0), "a\nb\nc\n")
+        self.assertEqual(
+            list(iter_source_lines(self.path, threshold=0)), ["a\n", "b\n", "c\n"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -135,6 +135,35 @@ class TestSplitNodesLink(unittest.TestCase):
         ]
         self.assertEqual(split_nodes_link(old_nodes), expected)
 
+    def test_link_repeating_image_syntax(self):
+        old_nodes = [TextNode("![x](y) then [x](y)", TextType.TEXT)]
+        expected = [
+            TextNode("![x](y) then ", TextType.TEXT),
+            TextNode("x", TextType.LINK, "y"),
+        ]
+        self.assertEqual(split_nodes_link(old_nodes), expected)
+
+
+class TestSplitNodesImageAndLink(unittest.TestCase):
+    def test_adjacent_images_and_links(self):
+        old_nodes = [
+            TextNode("![logo](/a.png)[Home](/)[Blog](/blog) ![x](y)", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+        ]
+        expected = [
+            TextNode("logo", TextType.IMAGE, "/a.png"),
+            TextNode("Home", TextType.LINK, "/"),
+            TextNode("Blog", TextType.LINK, "/blog"),
+            TextNode(" ", TextType.TEXT),
+            TextNode("x", TextType.IMAGE, "y"),
+            TextNode("bold", TextType.BOLD),
+        ]
+        self.assertEqual(split_nodes_link(split_nodes_image(old_nodes)), expected)
+
+    def test_unmatched_brackets_stay_text(self):
+        old_nodes = [TextNode("![broken](x and [ok](y", TextType.TEXT)]
+        self.assertEqual(split_nodes_link(split_nodes_image(old_nodes)), old_nodes)
+
 
 class TestSplitNodesImage(unittest.TestCase):
     def test_single_image(self):
@@ -0,0 +1,79 @@
+import io
+import os
+import tempfile
+import unittest
+
+from src import LeafNode, ParentNode, Template, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_slots_and_chunks(self):
+        template = Template("<title>{{ Title }}</title><main>{{Content}}</main>")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(template.chunks, ["<title>", "</title><main>", "</main>"])
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "<p>Hi</p>"}),
+            "<title>Home</title><p>Hi</p>",
+        )
+
+    def test_title_padding_is_dropped(self):
+        template = Template("<title> {{ Title }} </title><p> {{ Content }} </p>")
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "Hi"}),
+            "<title>Home</title><p> Hi </p>",
+        )
+
+    def test_custom_and_repeated_slots(self):
+        template = Template("{{ Title }} by {{ Author }} - {{ Title }}")
+        self.assertEqual(
+            template.render({"Title": "Post", "Author": "Ann"}), "Post by Ann - Post"
+        )
+
+    def test_missing_values_render_empty(self):
+        template = Template("<p>{{ Date }}</p>")
+        self.assertEqual(template.render({}), "<p></p>")
+
+    def test_render_node_value(self):
+        template = Template("<article>{{ Content }}</article>")
+        node = ParentNode("p", [LeafNode("b", "Hi")])
+        stream = io.StringIO()
+        template.write_to(stream, {"Content": node})
+        self.assertEqual(stream.getvalue(), "<article><p><b>Hi</b></p></article>")
+
+    def test_render_fragment_iterable(self):
+        template = Template("<main>{{ Content }}</main>")
+        fragments = (f"<p>{i}</p>" for i in range(3))
+        self.assertEqual(
+            template.render({"Content": fragments}),
+            "<main><p>0</p><p>1</p><p>2</p></main>",
+        )
+
+    def test_no_slots(self):
+        template = Template("<p>static</p>")
+        self.assertEqual(template.slots, [])
+        self.assertEqual(template.render({"Title": "x"}), "<p>static</p>")
+
+
+class TestLoadTemplate(unittest.TestCase):
+    def test_reloads_only_when_modified(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            with open(path, "w") as f:
+                f.write("{{ Content }}")
+
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+
+            with open(path, "w") as f:
+                f.write("<main>{{ Content }}</main>")
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+            self.assertEqual(
+                load_template(path).render({"Content": "x"}), "<main>x</main>"
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,19 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", TextType.BOLD)
         self.assertNotEqual(node, node2)
 
+    def test_text_type_from_value(self):
+        node = TextNode("This is a text node", "bold")
+        self.assertIs(node.text_type, TextType.BOLD)
+
+    def test_invalid_text_type(self):
+        with self.assertRaises(Exception) as context:
+            TextNode("This is a text node", "underline")
+        self.assertIn("Invalid type used for text node", str(context.exception))
+
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
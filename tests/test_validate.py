@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+from src import (
+    BrokenReference,
+    DependencyGraph,
+    Reference,
+    ValidationError,
+    build_output_index,
+    find_broken_references,
+    validate_site,
+)
+
+
+class TestValidate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        os.makedirs(os.path.join(self.static, "images"))
+        for name in ("index.css", os.path.join("images", "cover.png")):
+            open(os.path.join(self.static, name), "w").close()
+
+        self.graph = DependencyGraph()
+        self.graph.record(
+            "content/index.md",
+            "index.html",
+            "template.html",
+            [
+                Reference("link", "/blog", 3),
+                Reference("image", "/images/cover.png", 4),
+                Reference("link", "https://example.com/missing", 5),
+            ],
+            "full build",
+        )
+        self.graph.record(
+            "content/blog/index.md",
+            "blog/index.html",
+            "template.html",
+            [
+                Reference("link", "../", 1),
+                Reference("image", "cover.png", 2),
+                Reference("link", "/about", 7),
+            ],
+            "full build",
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_output_index(self):
+        self.assertEqual(
+            build_output_index(self.graph, self.static),
+            {"index.css", "images/cover.png", "index.html", "blog/index.html"},
+        )
+
+    def test_broken_references(self):
+        index = build_output_index(self.graph, self.static)
+        self.assertEqual(
+            find_broken_references(self.graph, index),
+            [
+                BrokenReference("content/blog/index.md", 2, "image", "cover.png"),
+                BrokenReference("content/blog/index.md", 7, "link", "/about"),
+            ],
+        )
+
+    def test_validate_site(self):
+        with self.assertRaises(ValidationError) as context:
+            validate_site(self.graph, self.static)
+        self.assertEqual(len(context.exception.broken), 2)
+        self.assertIn(
+            "content/blog/index.md:7: broken link /about", str(context.exception)
+        )
+
+        self.graph.record(
+            "content/blog/index.md",
+            "blog/index.html",
+            "template.html",
+            [Reference("image", "../images/cover.png", 2)],
+            "source changed",
+        )
+        validate_site(self.graph, self.static)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import threading
+import unittest
+
+from src import InotifyWatcher, PollingWatcher
+from tests.site_fixture import SiteFixture
+
+
+class WatcherTests(SiteFixture):
+    def create_watcher(self, paths):
+        raise NotImplementedError
+
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, "{{ Content }}")
+        self.watcher = self.create_watcher([self.content, self.template])
+
+    def tearDown(self):
+        self.watcher.close()
+        super().tearDown()
+
+    def test_reports_created_and_modified_files(self):
+        page = os.path.join(self.content, "index.md")
+        other = os.path.join(self.root, "other.txt")
+
+        def edit():
+            self.write(page, "# Home")
+            self.write(self.template, "<main>{{ Content }}</main>")
+            self.write(other, "ignored")
+
+        timer = threading.Timer(0.1, edit)
+        timer.start()
+        changed = set()
+        while not {page, self.template} <= changed:
+            batch = self.watcher.wait(timeout=5)
+            self.assertTrue(batch, "watcher timed out")
+            changed |= batch
+        # Every edit is on disk before the last events are collected.
+        timer.join()
+        changed |= self.watcher.wait(timeout=0.2)
+        self.assertNotIn(other, changed)
+
+    def test_reports_deleted_files(self):
+        page = os.path.join(self.content, "index.md")
+        self.write(page, "# Home")
+        self.watcher.wait(timeout=1)
+
+        timer = threading.Timer(0.1, os.remove, [page])
+        timer.start()
+        self.assertIn(page, self.watcher.wait(timeout=5))
+        timer.join()
+
+    def test_template_inside_watched_tree(self):
+        template = os.path.join(self.content, "post.html")
+        self.write(template, "{{ Content }}")
+        self.watcher.close()
+        self.watcher = self.create_watcher([self.content, template])
+        page = os.path.join(self.content, "index.md")
+
+        timer = threading.Timer(0.1, self.write, [page, "# Home"])
+        timer.start()
+        self.assertIn(page, self.watcher.wait(timeout=5))
+        timer.join()
+
+    def test_watch_adds_paths(self):
+        template = os.path.join(self.root, "post.html")
+        self.write(template, "{{ Content }}")
+        self.watcher.watch([self.content, template])
+
+        timer = threading.Timer(0.1, self.write, [template, "<p>{{ Content }}</p>"])
+        timer.start()
+        self.assertIn(template, self.watcher.wait(timeout=5))
+        timer.join()
+
+    def test_timeout_without_changes(self):
+        self.assertEqual(self.watcher.wait(timeout=0.05), set())
+
+
+class TestPollingWatcher(WatcherTests, unittest.TestCase):
+    def create_watcher(self, paths):
+        return PollingWatcher(paths, interval=0.01)
+
+
+class TestInotifyWatcher(WatcherTests, unittest.TestCase):
+    def create_watcher(self, paths):
+        try:
+            return InotifyWatcher(paths)
+        except OSError as e:
+            self.skipTest(f"inotify unavailable: {e}")
+
+
+if __name__ == "__main__":
+    unittest.main()